@@ -1,47 +1,67 @@
 # agents/planner_agent.py
-def generate_learning_plan(goal, skills, recommendations):
-    learning_plan = {}
+from recommender.fallback_links import placeholder_resource
+
+
+def build_week(skill, courses):
+    """
+    Plan entry for one skill: one resource per platform, placeholders for gaps.
+    Ranked resources carry their platform's other top courses as "alternatives".
+    """
+    # Ensure we have one course per platform
+    platform_courses = {
+        "coursera": None,
+        "udemy": None,
+        "youtube": None
+    }
     
-    for week, skill in enumerate(skills, 1):
-        courses = recommendations.get(skill, [])
+    for course in courses:
+        source = course.get("source", "").lower()
+        url = course.get("url", "")
         
-        # Ensure we have one course per platform
-        platform_courses = {
-            "coursera": None,
-            "udemy": None,
-            "youtube": None
-        }
-        
-        for course in courses:
-            source = course.get("source", "").lower()
-            url = course.get("url", "")
-            
-            # Only assign if not already filled AND the link is valid
-            if (
-                source in platform_courses
-                and platform_courses[source] is None
-                and url.startswith("http")
-            ):
-                platform_courses[source] = course
+        # Only assign if not already filled AND the link is valid
+        if (
+            source in platform_courses
+            and platform_courses[source] is None
+            and url.startswith("http")
+        ):
+            platform_courses[source] = course
 
-        
-        # Create final resources list
-        resources = []
-        for platform in ["coursera", "udemy", "youtube"]:
-            if platform_courses[platform]:
-                resources.append(platform_courses[platform])
-            else:
-                resources.append({
-                    "title": f"{skill} Course ({platform.title()})",
-                    "url": "#",
-                    "source": platform,
-                    "duration": "Coming soon",
-                    "relevance_score": 0.0
-                })
-        
-        learning_plan[week] = {
-            "skill": skill,
-            "resources": resources
-        }
     
-    return learning_plan
\ No newline at end of file
+    # Create final resources list
+    resources = []
+    for platform in ["coursera", "udemy", "youtube"]:
+        if platform_courses[platform]:
+            resources.append(platform_courses[platform])
+        else:
+            resources.append(placeholder_resource(skill, platform))
+    
+    return {
+        "skill": skill,
+        "resources": resources
+    }
+
+
+def generate_learning_plan(goal, skills, recommendations, previous=None):
+    """
+    One week per skill. Entries in `previous` (skill -> week data from an
+    earlier plan) are reused as-is instead of being rebuilt.
+    """
+    learning_plan = {}
+    previous = previous or {}
+    
+    for week, skill in enumerate(skills, 1):
+        if skill in previous:
+            learning_plan[week] = previous[skill]
+        else:
+            learning_plan[week] = build_week(skill, recommendations.get(skill, []))
+    
+    return learning_plan
+
+
+def iter_learning_plan(goal, ranked_skills):
+    """
+    Build the plan incrementally from (skill, ranked courses) pairs,
+    yielding (week, week_data) as soon as each skill is ready.
+    """
+    for week, (skill, courses) in enumerate(ranked_skills, 1):
+        yield week, build_week(skill, courses)
\ No newline at end of file
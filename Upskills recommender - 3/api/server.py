@@ -0,0 +1,303 @@
+# api/server.py
+"""
+Headless HTTP recommendation API.
+
+    POST /plan         {"goal": "...", "skills": [optional], "user_id": optional} -> learning plan JSON
+    POST /plan/stream  same body -> NDJSON: a header line, then one line per week
+    GET  /users/{user_id}           profile, latest plan and progress by week
+    PUT  /users/{user_id}/progress  {"week": 1, "status": "completed"}
+    GET  /health
+    GET  /metrics      Prometheus text format (?format=json for a JSON snapshot)
+
+The embedding model is loaded once at startup. Blocking I/O (Gemini, course
+fetching) runs on an I/O thread pool and CPU-bound ranking on a separate
+bounded pool, so the event loop stays free. Requests beyond API_MAX_QUEUE in
+flight are rejected with 503 (backpressure), and each request is bounded by
+API_REQUEST_TIMEOUT seconds. A request that timed out still counts as in
+flight until the worker job it started has finished.
+
+With a user_id, /plan skips skills the learner has completed, reuses their
+earlier plan entries and appends the new plan to their history.
+
+Run from the project directory:
+    uvicorn api.server:app --host 0.0.0.0 --port 8000
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from dotenv import load_dotenv
+load_dotenv()
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from pipeline import (
+    build_plan, build_user_plan, clean_skills, get_skills, iter_plan_weeks, lookup_rankings, rank_missing,
+)
+from recommender.model_registry import get_model
+from utils import metrics
+from utils.fetch_courses import load_course_data_from_all_sources
+from utils.progress_store import STATUSES, get_progress_store
+
+MAX_CONCURRENT = int(os.getenv("API_MAX_CONCURRENT", 32))
+MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", 256))
+REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", 60))
+RANK_WORKERS = int(os.getenv("API_RANK_WORKERS", os.cpu_count() or 4))
+IO_WORKERS = int(os.getenv("API_IO_WORKERS", 64))
+
+app = FastAPI(title="Upskilling Recommendation API")
+
+_rank_executor = ThreadPoolExecutor(max_workers=RANK_WORKERS, thread_name_prefix="rank")
+_io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+_semaphore = None
+_in_flight = 0
+
+
+class PlanRequest(BaseModel):
+    goal: str
+    skills: Optional[List[str]] = None
+    user_id: Optional[str] = None
+
+
+class ProgressUpdate(BaseModel):
+    week: int
+    status: str
+
+
+async def _run(executor, fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def _release_slot():
+    global _in_flight
+    _in_flight -= 1
+
+
+class _Slot:
+    """
+    A request's place in the API_MAX_QUEUE budget. It is held until the last
+    executor job the request started has finished, not just until the request
+    gives up: a timed-out job keeps its worker thread busy.
+    """
+
+    def __init__(self):
+        global _in_flight
+        _in_flight += 1
+        self._loop = asyncio.get_running_loop()
+        self._job = None
+
+    def submit(self, executor, fn, *args):
+        self._job = executor.submit(fn, *args)
+        return self._job
+
+    async def run(self, executor, fn, *args):
+        return await asyncio.wrap_future(self.submit(executor, fn, *args))
+
+    def release(self):
+        if self._job is None:
+            _release_slot()
+        else:
+            self._job.add_done_callback(lambda _: self._loop.call_soon_threadsafe(_release_slot))
+
+
+def _fetch_missing(skills):
+    """Cached skill rankings plus freshly fetched courses for the remaining skills"""
+    cached, missing = lookup_rankings(skills)
+    course_data = load_course_data_from_all_sources(missing) if missing else []
+    return cached, missing, course_data
+
+
+def _rank_and_plan(goal, skills, cached, missing, course_data):
+    recommendations = dict(cached)
+    if missing:
+        recommendations.update(rank_missing(missing, course_data))
+    return build_plan(goal, skills, recommendations)
+
+
+def _run_pipeline(goal, skills, profile=False):
+    """Synchronous fetch + rank + plan, optionally under the request profiler"""
+    with metrics.profile_request("plan", enabled=profile):
+        return _rank_and_plan(goal, skills, *_fetch_missing(skills))
+
+
+async def _resolve_skills(request, slot):
+    if request.skills:
+        skills = clean_skills(request.skills)
+    else:
+        skills = await slot.run(_io_executor, get_skills, request.goal)
+    if not skills:
+        raise HTTPException(status_code=422, detail="Could not extract skills from the goal")
+    return skills
+
+
+def _check_capacity(request):
+    if not request.goal.strip() and not request.skills:
+        raise HTTPException(status_code=422, detail="goal must not be empty")
+    if _in_flight >= MAX_QUEUE:
+        metrics.incr("api_rejected_total")
+        raise HTTPException(status_code=503, detail="Server busy, retry later",
+                            headers={"Retry-After": "1"})
+
+
+async def _plan(request, slot, profile=False):
+    async with _semaphore:
+        skills = await _resolve_skills(request, slot)
+        if request.user_id:
+            return await slot.run(_io_executor, build_user_plan, request.user_id, request.goal, skills)
+        if profile:
+            # One thread end to end so the profiler sees the whole request
+            return await slot.run(_io_executor, _run_pipeline, request.goal, skills, True)
+        cached, missing, course_data = await slot.run(_io_executor, _fetch_missing, skills)
+        return await slot.run(_rank_executor, _rank_and_plan, request.goal, skills, cached, missing, course_data)
+
+
+@app.on_event("startup")
+async def startup():
+    global _semaphore
+    _semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+    # Load the embedding model once, before the first request
+    await _run(_rank_executor, get_model)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "in_flight": _in_flight, "max_queue": MAX_QUEUE}
+
+
+@app.get("/metrics")
+async def get_metrics(format: str = "prometheus"):
+    if format == "json":
+        return JSONResponse(metrics.snapshot())
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/users/{user_id}")
+async def get_user(user_id: str):
+    user = await _run(_io_executor, get_progress_store().get_user, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail=f"Unknown user '{user_id}'")
+    return user
+
+
+@app.put("/users/{user_id}/progress")
+async def update_progress(user_id: str, update: ProgressUpdate):
+    if update.status not in STATUSES:
+        raise HTTPException(status_code=422, detail=f"status must be one of {list(STATUSES)}")
+    try:
+        skill = await _run(_io_executor, get_progress_store().set_week_progress,
+                           user_id, update.week, update.status)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return {"user_id": user_id, "week": update.week, "skill": skill, "status": update.status}
+
+
+@app.post("/plan")
+async def plan(request: PlanRequest, x_profile: Optional[str] = Header(default=None)):
+    """Send "X-Profile: 1" to profile this request (requires PROFILING_ENABLED=1)"""
+    _check_capacity(request)
+
+    slot = _Slot()
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(_plan(request, slot, profile=x_profile == "1"), timeout=REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        metrics.incr("api_timeouts_total", endpoint="/plan")
+        raise HTTPException(status_code=504, detail=f"Plan generation exceeded {REQUEST_TIMEOUT:.0f}s")
+    finally:
+        slot.release()
+        metrics.observe("api_request_seconds", time.perf_counter() - start, endpoint="/plan")
+
+
+@app.post("/plan/stream")
+async def plan_stream(request: PlanRequest):
+    """Stream the plan week by week, so week 1 arrives as soon as its skill is ranked"""
+    _check_capacity(request)
+
+    slot = _Slot()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + REQUEST_TIMEOUT
+    streaming = False  # once True, the stream's producer releases the semaphore
+    try:
+        await asyncio.wait_for(_semaphore.acquire(), timeout=REQUEST_TIMEOUT)
+        try:
+            skills = await asyncio.wait_for(_resolve_skills(request, slot), timeout=max(deadline - loop.time(), 0))
+            response = _stream_plan(request.goal, skills, slot, loop, deadline)
+            streaming = True
+            return response
+        finally:
+            if not streaming:
+                _semaphore.release()
+    except asyncio.TimeoutError:
+        metrics.incr("api_timeouts_total", endpoint="/plan/stream")
+        raise HTTPException(status_code=504, detail=f"Plan generation exceeded {REQUEST_TIMEOUT:.0f}s")
+    finally:
+        slot.release()  # once the stream's producer, its last job, has stopped
+
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that calls on_close however it ends, even when the
+    client disconnects before the body is iterated"""
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+def _stream_plan(goal, skills, slot, loop, deadline):
+    """
+    NDJSON response of the plan, week by week. The request's slot is held until
+    the producer thread stops, which it does early once the response is closed.
+    """
+    queue = asyncio.Queue()
+    closed = threading.Event()
+
+    def produce():
+        try:
+            for week, data in iter_plan_weeks(goal, skills):
+                loop.call_soon_threadsafe(queue.put_nowait, {"week": week, **data})
+                if closed.is_set():
+                    break  # nobody is reading: stop fetching and ranking
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, {"error": str(e)})
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+            loop.call_soon_threadsafe(_semaphore.release)
+
+    slot.submit(_io_executor, produce)
+
+    async def body():
+        try:
+            yield json.dumps({"goal": goal, "skills": skills}) + "\n"
+            for _ in range(len(skills) + 1):
+                remaining = deadline - loop.time()
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=max(remaining, 0))
+                except asyncio.TimeoutError:
+                    yield json.dumps({"error": f"Plan generation exceeded {REQUEST_TIMEOUT:.0f}s"}) + "\n"
+                    return
+                if item is None:
+                    return
+                yield json.dumps(item) + "\n"
+        finally:
+            closed.set()
+
+    return _ClosingStreamingResponse(body(), closed.set, media_type="application/x-ndjson")
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.getenv("API_HOST", "0.0.0.0"), port=int(os.getenv("API_PORT", 8000)))
@@ -0,0 +1,206 @@
+# batch_plan.py
+"""
+Offline plan generation for a file of goals.
+
+Goals are streamed from JSONL ({"id": ..., "goal": ..., "skills": [...]}) or
+CSV (id, goal columns). Skills are de-duplicated across the whole batch:
+every unique skill is fetched, embedded and ranked exactly once, in one
+batched call per chunk of goals. Plans are streamed to a JSONL output file,
+and --resume skips goals whose id is already in the output (after cutting
+off a line left half-written by an interrupted run). Goals without skills
+are extracted together through the batching Gemini scheduler.
+
+Memory is bounded by the chunk size and --max-skills: rankings are held in
+an LRU, and a skill evicted from it is served by the ranking cache later.
+
+Usage:
+    python batch_plan.py goals.jsonl -o plans.jsonl
+    python batch_plan.py goals.csv -o plans.jsonl --resume
+    python batch_plan.py goals.jsonl -o plans.jsonl --processes 8
+"""
+import argparse
+import csv
+import json
+import os
+from collections import OrderedDict
+from itertools import islice
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from pipeline import build_plan, clean_skills, get_skills_many, lookup_rankings, rank_missing
+from recommender.course_ranker import clean_skill_name
+from recommender.parallel_ranker import ParallelRanker
+from utils.fetch_courses import load_course_data_from_all_sources
+
+
+def read_goals(path):
+    """Yield goal records one at a time from a JSONL or CSV file"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row_number, row in enumerate(csv.DictReader(f), 1):
+                record = {"id": row.get("id") or f"row-{row_number}", "goal": row.get("goal", "")}
+                if row.get("skills"):
+                    record["skills"] = [s for s in row["skills"].split(",") if s.strip()]
+                yield record
+        else:
+            for row_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record, str):
+                    record = {"goal": record}
+                record.setdefault("id", f"row-{row_number}")
+                yield record
+
+
+def completed_ids(output_path):
+    """Ids already written to the output (for --resume)"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError):
+                # A partially written last line from an interrupted run
+                continue
+    return done
+
+
+def drop_partial_line(output_path):
+    """Truncate a trailing line without a newline, so appended records start on their own line"""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(position - 4096, 0)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            print(f"✂️ Dropping a partial last line from {output_path}")
+            f.truncate(position)
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class SkillRankings:
+    """
+    Ranked courses per clean skill name, computed once per unique skill
+    (or taken from the shared ranking cache). At most max_skills are held;
+    the least recently used ones outside the current chunk are dropped.
+    """
+
+    def __init__(self, ranker=None, max_skills=10000):
+        self.rankings = OrderedDict()
+        self.ranker = ranker
+        self.max_skills = max_skills
+
+    def ensure(self, skills):
+        wanted = {clean_skill_name(skill) for skill in skills}
+        for key in wanted & self.rankings.keys():
+            self.rankings.move_to_end(key)
+
+        new_skills = list(dict.fromkeys(
+            skill for skill in skills if clean_skill_name(skill) not in self.rankings
+        ))
+        if new_skills:
+            self._add(new_skills)
+
+        while len(self.rankings) > self.max_skills:
+            oldest = next(iter(self.rankings))
+            if oldest in wanted:
+                break  # everything left is needed by the current chunk
+            del self.rankings[oldest]
+
+    def _add(self, new_skills):
+        cached, missing = lookup_rankings(new_skills)
+        ranked = dict(cached)
+        if missing:
+            print(f"🔄 Fetching and ranking {len(missing)} new skills ({len(cached)} cached)")
+            course_data = load_course_data_from_all_sources(missing)
+            ranked.update(rank_missing(missing, course_data, self.ranker))
+        for skill in new_skills:
+            self.rankings[clean_skill_name(skill)] = ranked.get(clean_skill_name(skill), [])
+
+    def recommendations_for(self, skills):
+        return {skill: self.rankings.get(clean_skill_name(skill), []) for skill in skills}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate learning plans for a file of goals")
+    parser.add_argument("input", help="goals file (.jsonl or .csv)")
+    parser.add_argument("-o", "--output", default="plans.jsonl")
+    parser.add_argument("--chunk-size", type=int, default=100, help="goals processed per batch")
+    parser.add_argument("--resume", action="store_true", help="skip goals already in the output")
+    parser.add_argument("--max-skills", type=int, default=10000,
+                        help="ranked skills held in memory (older ones come from the ranking cache)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes for course lists of RANK_PARALLEL_MIN_COURSES or more "
+                             "(1 ranks in-process)")
+    args = parser.parse_args()
+
+    if args.resume:
+        drop_partial_line(args.output)
+    done = completed_ids(args.output) if args.resume else set()
+    if done:
+        print(f"⏩ Resuming: {len(done)} goals already done")
+
+    ranker = ParallelRanker(max_workers=args.processes)
+    rankings = SkillRankings(ranker, args.max_skills)
+    written = skipped = failed = 0
+
+    with open(args.output, "a" if args.resume else "w", encoding="utf-8") as out:
+        for chunk in chunks(read_goals(args.input), args.chunk_size):
+            pending = [record for record in chunk if str(record["id"]) not in done]
+            skipped += len(chunk) - len(pending)
+
+            goal_skills = {}
+            to_extract = []
+            for record in pending:
+                if record.get("skills"):
+                    goal_skills[record["id"]] = clean_skills(record["skills"])
+                else:
+                    to_extract.append(record)
+            # Goals without skills are extracted together, in batched Gemini prompts
+            try:
+                extracted = get_skills_many([record["goal"] for record in to_extract])
+                goal_skills.update((record["id"], skills) for record, skills in zip(to_extract, extracted))
+            except Exception as e:
+                print(f"❌ Skill extraction failed for {len(to_extract)} goals: {e}")
+
+            rankings.ensure([s for skills in goal_skills.values() for s in skills])
+
+            for record in pending:
+                skills = goal_skills.get(record["id"])
+                if skills is None:
+                    failed += 1
+                    continue
+                plan = build_plan(record["goal"], skills, rankings.recommendations_for(skills))
+                out.write(json.dumps({"id": record["id"], **plan}) + "\n")
+                written += 1
+            out.flush()
+            print(f"💾 {written} plans written ({len(rankings.rankings)} skills in memory)")
+
+    ranker.close()
+    print(f"✅ Done: {written} written, {skipped} skipped, {failed} failed → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
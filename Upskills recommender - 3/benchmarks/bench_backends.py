@@ -0,0 +1,128 @@
+# benchmarks/bench_backends.py
+"""
+Accuracy vs speed of the embedding backends (torch fp32, int8, ONNX).
+
+Every backend embeds the same fixed skill and course set. Speed is measured
+as encode throughput per batch size (the embedding cache is bypassed).
+Accuracy is measured against the fp32 baseline: mean cosine between the two
+embeddings of each text, top-1 agreement, overlap of the top-k courses per
+skill, and Spearman correlation of the per-skill course scores.
+
+Usage:
+    python benchmarks/bench_backends.py --backends torch int8 onnx --threads 4
+    python benchmarks/bench_backends.py --batch-sizes 16 64 256 --k 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from recommender import model_registry
+
+SKILLS = ["Python", "SQL", "Statistics", "Machine Learning", "Pandas", "Git", "Deep Learning",
+          "Docker", "Excel", "Tableau", "JavaScript", "Project Management"]
+TOPICS = SKILLS + ["React", "Linux", "Spark", "Kubernetes", "Data Visualization", "Communication"]
+TEMPLATES = [
+    ("{t} for Beginners", "Start from zero and learn the fundamentals of {t}"),
+    ("Complete {t} Bootcamp", "Everything you need to master {t}, with real projects"),
+    ("Advanced {t}", "Deep dive into advanced {t} techniques used in industry"),
+    ("{t} Crash Course", "A fast-paced introduction to {t} in one sitting"),
+    ("Practical {t} Projects", "Build a portfolio of hands-on {t} projects"),
+]
+
+
+def fixed_courses():
+    """Deterministic course texts: every topic in every template"""
+    return [f"{title.format(t=topic)} {description.format(t=topic)}"
+            for topic in TOPICS for title, description in TEMPLATES]
+
+
+def normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def ranks(values):
+    order = np.argsort(values)
+    result = np.empty(len(values))
+    result[order] = np.arange(len(values))
+    return result
+
+
+def spearman(a, b):
+    return float(np.corrcoef(ranks(a), ranks(b))[0, 1])
+
+
+def encode(model, texts, batch_size):
+    return np.asarray(model.encode(texts, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"],
+                        choices=model_registry.SUPPORTED_BACKENDS)
+    parser.add_argument("--threads", type=int, help="intra-op threads for every backend")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--repeat", type=int, default=3, help="timed encodes per batch size (best is kept)")
+    parser.add_argument("--k", type=int, default=5, help="top-k used for ranking agreement")
+    args = parser.parse_args()
+
+    courses = fixed_courses()
+    texts = SKILLS + courses
+    print(f"{len(SKILLS)} skills x {len(courses)} courses, top-{args.k} agreement vs fp32 torch\n")
+
+    baseline = None
+    rows = []
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        model_registry.configure(backend=backend, num_threads=args.threads)
+        start = time.perf_counter()
+        try:
+            model = model_registry.get_model()
+            encode(model, texts[:8], 8)  # first call pays graph/session setup
+        except Exception as e:
+            print(f"⚠️ {backend}: unavailable ({e})")
+            if backend == "torch":
+                return  # no baseline to compare against
+            continue
+        load_s = time.perf_counter() - start
+
+        throughput = {}
+        for batch_size in args.batch_sizes:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                embeddings = encode(model, texts, batch_size)
+                best = min(best, time.perf_counter() - start)
+            throughput[batch_size] = len(texts) / best
+
+        embeddings = normalize(embeddings)
+        scores = embeddings[:len(SKILLS)] @ embeddings[len(SKILLS):].T
+        top_k = np.argsort(-scores, axis=1)[:, :args.k]
+        if baseline is None:
+            baseline = (embeddings, scores, top_k)
+
+        base_embeddings, base_scores, base_top_k = baseline
+        rows.append({
+            "backend": backend,
+            "load_s": load_s,
+            "throughput": throughput,
+            "cosine": float(np.mean(np.sum(embeddings * base_embeddings, axis=1))),
+            "top1": float(np.mean(top_k[:, 0] == base_top_k[:, 0])),
+            "overlap": float(np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top_k, base_top_k)])),
+            "spearman": float(np.mean([spearman(a, b) for a, b in zip(scores, base_scores)])),
+        })
+
+    header = " ".join(f"{f'bs={b} t/s':>11}" for b in args.batch_sizes)
+    print(f"{'backend':<8} {'load s':>7} {header} {'cosine':>7} {'top-1':>6} {f'top-{args.k}':>6} {'rho':>6}")
+    for row in rows:
+        speeds = " ".join(f"{row['throughput'][b]:>11.0f}" for b in args.batch_sizes)
+        print(f"{row['backend']:<8} {row['load_s']:>7.2f} {speeds} {row['cosine']:>7.4f} "
+              f"{row['top1']:>6.0%} {row['overlap']:>6.0%} {row['spearman']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_catalogue.py
+"""
+Query latency and recall of the catalogue IVF index vs an exact scan,
+on synthetic clustered unit vectors (no model needed).
+
+Usage:
+    python benchmarks/bench_catalogue.py --size 50000 --queries 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from recommender.catalogue import IVFIndex, _normalize_rows, _top_k
+
+
+def make_vectors(n, dim, clusters, rng):
+    centres = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    return _normalize_rows(centres[labels] + 0.5 * rng.normal(size=(n, dim)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = make_vectors(args.size, args.dim, clusters=200, rng=rng)
+    queries = make_vectors(args.queries, args.dim, clusters=200, rng=rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "vectors.f32")
+        vectors.tofile(path)
+        memmap = np.memmap(path, dtype=np.float32, mode="r", shape=vectors.shape)
+
+        start = time.perf_counter()
+        exact = [set(_top_k(memmap @ q, args.k).tolist()) for q in queries]
+        exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        print(f"exact scan: {exact_ms:.3f} ms/query")
+
+        index = IVFIndex(tmp)
+        start = time.perf_counter()
+        index.train(memmap)
+        print(f"IVF train: {time.perf_counter() - start:.2f} s ({len(index.centroids)} lists)")
+
+        for nprobe in args.nprobe:
+            index.nprobe = nprobe
+            start = time.perf_counter()
+            results = index.search(memmap, queries, args.k)
+            ivf_ms = (time.perf_counter() - start) * 1000 / len(queries)
+            recall = np.mean([
+                len(truth & {i for i, _ in hits}) / args.k for truth, hits in zip(exact, results)
+            ])
+            print(f"IVF nprobe={nprobe:>3}: {ivf_ms:.3f} ms/query, recall@{args.k} {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_course_matcher.py
+"""
+Compare the old per-pair matching loop against the batched similarity matrix.
+
+Usage:
+    python benchmarks/bench_course_matcher.py --sizes 10 100 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# Keep the persistent embedding cache out of the measurement
+os.environ.setdefault("EMBEDDING_CACHE_DIR", "")
+
+from sentence_transformers import util
+from recommender.course_matcher import course_text, match_courses
+from recommender.embedder import get_cache
+from recommender.model_registry import get_model
+
+SKILLS = ["Python", "SQL", "Statistics", "Machine Learning", "Pandas", "Git", "Deep Learning"]
+TOPICS = ["Python", "SQL", "Statistics", "Machine Learning", "Pandas", "Git", "Deep Learning",
+          "Docker", "Excel", "Tableau", "Spark", "JavaScript", "React", "Linux"]
+
+
+def make_courses(n):
+    """Synthetic course list of size n"""
+    courses = []
+    for i in range(n):
+        topic = TOPICS[i % len(TOPICS)]
+        courses.append({
+            "title": f"{topic} complete course part {i}",
+            "description": f"Learn {topic} from scratch with hands-on project {i}",
+            "url": f"https://example.com/course/{i}",
+            "source": "youtube",
+        })
+    return courses
+
+
+def legacy_match_courses(skills, courses):
+    """The original O(S*C) loop: one encode call per skill and per course"""
+    model = get_model()
+    recommendations = {}
+    for skill in skills:
+        skill_embedding = model.encode(skill, convert_to_tensor=True)
+        best_score = -1
+        best_course = None
+        for course in courses:
+            course_embedding = model.encode(course_text(course), convert_to_tensor=True)
+            similarity = util.pytorch_cos_sim(skill_embedding, course_embedding)[0][0].item()
+            if similarity > best_score:
+                best_score = similarity
+                best_course = course
+        recommendations[skill] = {"title": best_course["title"], "url": best_course["url"]}
+    return recommendations
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the batched path")
+    args = parser.parse_args()
+
+    # Warm up the model so the first row doesn't include lazy init costs
+    match_courses(SKILLS[:1], make_courses(2))
+
+    print(f"{'courses':>8} {'legacy (s)':>12} {'batched (s)':>12} {'speedup':>9} {'agree':>6}")
+    for size in args.sizes:
+        courses = make_courses(size)
+        get_cache().clear_memory()
+        batched_time, batched = timed(match_courses, SKILLS, courses)
+        if args.skip_legacy:
+            print(f"{size:>8} {'-':>12} {batched_time:>12.3f} {'-':>9} {'-':>6}")
+            continue
+        legacy_time, legacy = timed(legacy_match_courses, SKILLS, courses)
+        agree = sum(legacy[s]["url"] == batched[s]["url"] for s in SKILLS)
+        print(f"{size:>8} {legacy_time:>12.3f} {batched_time:>12.3f} "
+              f"{legacy_time / batched_time:>8.1f}x {agree:>3}/{len(SKILLS)}")
+
+
+if __name__ == "__main__":
+    main()
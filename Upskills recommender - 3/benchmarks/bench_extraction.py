@@ -0,0 +1,78 @@
+# benchmarks/bench_extraction.py
+"""
+Skill extraction under a burst of concurrent goals: one Gemini prompt per goal
+vs the coalescing ExtractionScheduler, against the local fake model.
+
+Reports Gemini calls, batch sizes and p50/p95 caller latency. --max-concurrent
+models the LLM rate limit: at most that many prompts are in flight at once.
+
+Usage:
+    python benchmarks/bench_extraction.py --users 200 --distinct 50 --latency 0.5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_pipeline import percentile
+from benchmarks.fake_models import FakeGenerativeModel
+from utils.extraction_scheduler import ExtractionScheduler
+
+
+def run_burst(goals, extract):
+    """Fire every goal at once from its own thread; return per-caller latencies"""
+    latencies = [0.0] * len(goals)
+
+    def call(i):
+        start = time.perf_counter()
+        extract(goals[i])
+        latencies[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(goals))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def report(name, latencies, model):
+    sizes = model.batch_sizes
+    print(f"{name:<12} calls={model.calls:<5} mean batch={sum(sizes) / max(len(sizes), 1):>5.1f} "
+          f"p50={percentile(latencies, 50) * 1000:>8.1f} ms  p95={percentile(latencies, 95) * 1000:>8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="concurrent goals in the burst")
+    parser.add_argument("--distinct", type=int, default=50, help="distinct goals among them")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake Gemini latency per prompt (s)")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="prompts in flight at once")
+    parser.add_argument("--window-ms", type=float, default=25)
+    parser.add_argument("--max-batch", type=int, default=16)
+    args = parser.parse_args()
+
+    goals = [f"I want to become goal-{i % args.distinct} engineer" for i in range(args.users)]
+
+    # Baseline: one prompt per caller, capped at max_concurrent in flight
+    model = FakeGenerativeModel(latency=args.latency)
+    limiter = threading.Semaphore(args.max_concurrent)
+
+    def single(goal):
+        with limiter:
+            return model.generate_content(f'The user says: "{goal}"')
+
+    report("per-goal", run_burst(goals, single), model)
+
+    model = FakeGenerativeModel(latency=args.latency)
+    scheduler = ExtractionScheduler(lambda: model, window=args.window_ms / 1000,
+                                    max_batch=args.max_batch, max_concurrent=args.max_concurrent)
+    report("coalesced", run_burst(goals, scheduler.extract), model)
+    print(f"scheduler stats: {scheduler.stats}")
+
+
+if __name__ == "__main__":
+    main()
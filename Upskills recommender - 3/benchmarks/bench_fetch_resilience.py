@@ -0,0 +1,78 @@
+# benchmarks/bench_fetch_resilience.py
+"""
+Live course fetching against a fake YouTube API that is slow or failing.
+
+Runs load_course_data_from_all_sources through a series of scenarios on the
+same process (healthy, slow tail, intermittent errors, outage, recovery,
+exhausted quota) and
+reports wall time, YouTube videos per skill, requests that reached the API
+and the circuit breaker state after each call. The response cache is off so
+every call goes out.
+
+Usage:
+    python benchmarks/bench_fetch_resilience.py --skills 7 --budget 2 --slow-latency 10
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.fake_models import SKILL_POOL
+from benchmarks.fake_youtube import FakeYouTubeServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skills", type=int, default=7)
+    parser.add_argument("--latency", type=float, default=0.1, help="normal API latency (s)")
+    parser.add_argument("--slow-latency", type=float, default=10, help="extra latency of slow requests (s)")
+    parser.add_argument("--budget", type=float, default=2, help="YOUTUBE_FETCH_BUDGET (s)")
+    parser.add_argument("--request-timeout", type=float, default=5, help="YOUTUBE_REQUEST_TIMEOUT (s)")
+    parser.add_argument("--cooldown", type=float, default=5, help="YOUTUBE_BREAKER_COOLDOWN (s)")
+    args = parser.parse_args()
+
+    scenarios = [
+        ("healthy", {}),
+        ("slow tail 30%", {"slow_rate": 0.3}),
+        ("errors 30%", {"error_rate": 0.3}),
+        ("outage (503)", {"error_rate": 1.0}),
+        ("outage, open", {"error_rate": 1.0}),
+        ("half-open", {"wait": args.cooldown}),
+        ("recovered", {}),
+        ("quota (403)", {"error_rate": 1.0, "error_status": 403}),
+    ]
+
+    with FakeYouTubeServer(latency=args.latency, slow_latency=args.slow_latency) as server:
+        os.environ["YOUTUBE_SEARCH_URL"] = server.search_url
+        os.environ["YOUTUBE_API_KEY"] = "fake-key"
+        os.environ["YOUTUBE_CACHE_PATH"] = ""
+        os.environ["YOUTUBE_REQUESTS_PER_SECOND"] = "1000"
+        os.environ["YOUTUBE_BURST"] = "1000"
+        os.environ["YOUTUBE_FETCH_BUDGET"] = str(args.budget)
+        os.environ["YOUTUBE_REQUEST_TIMEOUT"] = str(args.request_timeout)
+        os.environ["YOUTUBE_BREAKER_COOLDOWN"] = str(args.cooldown)
+        os.environ.setdefault("FETCH_MAX_WORKERS", str(args.skills * 3))
+
+        from utils import fetch_courses
+
+        skills = SKILL_POOL[:args.skills]
+        print(f"{'scenario':<15} {'seconds':>8} {'videos/skill':>13} {'api calls':>10}  circuit")
+        for name, faults in scenarios:
+            time.sleep(faults.pop("wait", 0))
+            server.error_rate = faults.get("error_rate", 0.0)
+            server.error_status = faults.get("error_status", 503)
+            server.slow_rate = faults.get("slow_rate", 0.0)
+
+            requests_before = server.request_count
+            start = time.perf_counter()
+            courses = fetch_courses.load_course_data_from_all_sources(skills, live=True)
+            elapsed = time.perf_counter() - start
+            videos = sum(course.get("source") == "youtube" for course in courses)
+            print(f"{name:<15} {elapsed:>8.2f} {videos / len(skills):>13.1f} "
+                  f"{server.request_count - requests_before:>10}  {fetch_courses._youtube_breaker.state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_parallel_ranker.py
+"""
+Serial rank_all_skills vs the process-pool ParallelRanker on large course lists.
+
+Uses the deterministic fake embedding model and an in-memory embedding cache,
+so both runs embed the same texts. Reports wall time per worker count and
+checks that the parallel result is identical to the serial one.
+
+Usage:
+    python benchmarks/bench_parallel_ranker.py --courses 20000 100000 --workers 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_pipeline import synthetic_courses
+from benchmarks.fake_models import FakeEmbeddingModel, SKILL_POOL
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--skills", type=int, default=7)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    os.environ["EMBEDDING_CACHE_DIR"] = ""
+
+    from recommender import model_registry
+    from recommender.course_ranker import rank_all_skills
+    from recommender.parallel_ranker import ParallelRanker
+
+    model_registry.set_model(FakeEmbeddingModel())
+    skills = SKILL_POOL[:args.skills]
+
+    print(f"{'courses':>8} {'workers':>8} {'seconds':>8} {'speedup':>8}  identical")
+    for total in args.courses:
+        courses = synthetic_courses(skills, total)
+        rank_all_skills(skills, courses[:100])  # load the model outside the timings
+
+        start = time.perf_counter()
+        expected = rank_all_skills(skills, courses)
+        serial_s = time.perf_counter() - start
+        print(f"{total:>8} {'serial':>8} {serial_s:>8.2f} {1:>8.2f}")
+
+        for workers in args.workers:
+            with ParallelRanker(max_workers=workers, min_courses=0) as ranker:
+                ranker.rank_all_skills(skills, courses[:100])  # start the worker processes
+                start = time.perf_counter()
+                ranked = ranker.rank_all_skills(skills, courses)
+                elapsed = time.perf_counter() - start
+            print(f"{total:>8} {workers:>8} {elapsed:>8.2f} {serial_s / elapsed:>8.2f}  {ranked == expected}")
+
+
+if __name__ == "__main__":
+    main()
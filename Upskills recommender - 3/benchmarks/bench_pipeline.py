@@ -0,0 +1,242 @@
+# benchmarks/bench_pipeline.py
+"""
+End-to-end benchmark of goal -> skills -> courses -> rank -> plan.
+
+Gemini and the YouTube API are replaced by deterministic local stubs, and the
+embedding model can be stubbed too (--fake-embedder). For every (skills x
+courses) scenario each stage reports p50/p95 latency, throughput, peak RSS
+and model/API call counts. Results are written as JSON so runs on different
+commits can be compared.
+
+Usage:
+    python benchmarks/bench_pipeline.py --skills 3 7 --courses 10 100 1000 -o bench.json
+    python benchmarks/bench_pipeline.py --compare bench.json -o bench_new.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.fake_models import FakeEmbeddingModel, FakeGenerativeModel, SKILL_POOL
+from benchmarks.fake_youtube import FakeYouTubeServer
+
+STAGES = ["extract_skills", "load_course_data_from_all_sources", "rank_all_skills",
+          "match_courses", "generate_learning_plan"]
+
+
+class CountingModel:
+    """Wraps an embedding model and counts encode() calls and encoded texts"""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+        self.texts = 0
+
+    def encode(self, sentences, *args, **kwargs):
+        self.calls += 1
+        self.texts += 1 if isinstance(sentences, str) else len(sentences)
+        return self.model.encode(sentences, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = int(rank), min(int(rank) + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def synthetic_courses(skills, total):
+    """Extra YouTube-style courses spread over the skills to scale the catalogue"""
+    courses = []
+    for i in range(total):
+        skill = skills[i % len(skills)]
+        courses.append({
+            "title": f"{skill} complete course {i}",
+            "description": f"Hands-on {skill} lessons, project {i}",
+            "url": f"https://www.youtube.com/watch?v=synthetic{i:06d}",
+            "source": "youtube",
+            "duration": "Video Course",
+            "skill": skill,
+            "is_search_link": False,
+        })
+    return courses
+
+
+class StageRecorder:
+    """Times stage calls and tracks call-count deltas for each stage"""
+
+    def __init__(self, counters):
+        self.counters = counters
+        self.samples = {stage: [] for stage in STAGES}
+        self.calls = {stage: {name: 0 for name in counters} for stage in STAGES}
+        self.rss = {stage: 0.0 for stage in STAGES}
+
+    def run(self, stage, fn, *args):
+        before = {name: read() for name, read in self.counters.items()}
+        start = time.perf_counter()
+        result = fn(*args)
+        self.samples[stage].append(time.perf_counter() - start)
+        for name, read in self.counters.items():
+            self.calls[stage][name] += read() - before[name]
+        self.rss[stage] = peak_rss_mb()
+        return result
+
+    def summary(self):
+        summary = {}
+        for stage in STAGES:
+            samples = self.samples[stage]
+            total = sum(samples)
+            summary[stage] = {
+                "runs": len(samples),
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "throughput_per_s": len(samples) / total if total else 0.0,
+                "peak_rss_mb": self.rss[stage],
+                "calls_per_run": {
+                    name: count / max(len(samples), 1) for name, count in self.calls[stage].items()
+                },
+            }
+        return summary
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(baseline_path, results, threshold):
+    """Print p50 changes against an earlier results file"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\n=== Compared to {baseline_path} ({baseline.get('commit', '?')}) ===")
+    for scenario, stages in results["scenarios"].items():
+        old_stages = baseline.get("scenarios", {}).get(scenario)
+        if not old_stages:
+            continue
+        for stage, stats in stages.items():
+            old = old_stages.get(stage, {}).get("p50_ms")
+            if not old:
+                continue
+            ratio = stats["p50_ms"] / old
+            flag = "⚠️ REGRESSION" if ratio > threshold else ""
+            print(f"{scenario:>12} {stage:<36} {old:>10.2f} -> {stats['p50_ms']:>10.2f} ms "
+                  f"({ratio:.2f}x) {flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skills", type=int, nargs="+", default=[3, 7])
+    parser.add_argument("--courses", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--youtube-latency", type=float, default=0.05)
+    parser.add_argument("--gemini-latency", type=float, default=0.2)
+    parser.add_argument("--fake-embedder", action="store_true", help="use a hashing stub instead of MiniLM")
+    parser.add_argument("--warm", action="store_true", help="keep in-process caches between iterations")
+    parser.add_argument("-o", "--output", default="bench_pipeline.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio flagged as a regression")
+    args = parser.parse_args()
+
+    with FakeYouTubeServer(latency=args.youtube_latency) as server, tempfile.TemporaryDirectory() as tmp:
+        # Point every external dependency at local stubs before the app modules load
+        os.environ["YOUTUBE_SEARCH_URL"] = server.search_url
+        os.environ["YOUTUBE_API_KEY"] = "fake-key"
+        os.environ.setdefault("YOUTUBE_REQUESTS_PER_SECOND", "1000")
+        os.environ.setdefault("YOUTUBE_BURST", "1000")
+        os.environ["YOUTUBE_CACHE_PATH"] = os.path.join(tmp, "youtube_cache.db") if args.warm else ""
+        os.environ["SKILL_CACHE_PATH"] = os.path.join(tmp, "skills_cache.db") if args.warm else ""
+        os.environ["EMBEDDING_CACHE_DIR"] = os.path.join(tmp, "embeddings") if args.warm else ""
+        os.environ["RANKING_CACHE_PATH"] = os.path.join(tmp, "rankings_cache.db") if args.warm else ""
+
+        from agents.planner_agent import generate_learning_plan
+        from recommender import model_registry
+        from recommender.course_matcher import match_courses
+        from recommender.course_ranker import rank_all_skills
+        from recommender.embedder import get_cache
+        from utils import skills_extractor
+        from utils.fetch_courses import load_course_data_from_all_sources
+
+        gemini = FakeGenerativeModel(latency=args.gemini_latency)
+        skills_extractor._model = gemini
+
+        base_model = FakeEmbeddingModel() if args.fake_embedder else model_registry.get_model()
+        model = CountingModel(base_model)
+        model_registry.set_model(model)
+
+        counters = {
+            "embedding_encode_calls": lambda: model.calls,
+            "embedding_texts": lambda: model.texts,
+            "gemini_calls": lambda: gemini.calls,
+            "youtube_requests": lambda: server.request_count,
+        }
+
+        results = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "params": vars(args),
+            "scenarios": {},
+        }
+
+        for skill_count in args.skills:
+            gemini.skills_per_goal = skill_count
+            for course_count in args.courses:
+                scenario = f"s{skill_count}_c{course_count}"
+                print(f"▶ {scenario}")
+                recorder = StageRecorder(counters)
+
+                for i in range(args.iterations):
+                    if not args.warm:
+                        get_cache().clear_memory()
+                    goal = f"I want to become a specialist in {SKILL_POOL[i % len(SKILL_POOL)]} #{i}"
+
+                    skills = recorder.run("extract_skills", skills_extractor.extract_skills, goal)
+                    courses = recorder.run("load_course_data_from_all_sources",
+                                           load_course_data_from_all_sources, skills)
+                    courses = courses + synthetic_courses(skills, course_count)
+                    ranked = recorder.run("rank_all_skills", rank_all_skills, skills, courses)
+                    recorder.run("match_courses", match_courses, skills, courses)
+                    recorder.run("generate_learning_plan", generate_learning_plan, goal, skills, ranked)
+
+                results["scenarios"][scenario] = recorder.summary()
+
+    print(f"\n{'scenario':>12} {'stage':<36} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>8} {'rss MB':>8} calls")
+    for scenario, stages in results["scenarios"].items():
+        for stage, stats in stages.items():
+            calls = ", ".join(f"{k}={v:g}" for k, v in stats["calls_per_run"].items() if v)
+            print(f"{scenario:>12} {stage:<36} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} "
+                  f"{stats['throughput_per_s']:>8.2f} {stats['peak_rss_mb']:>8.1f} {calls}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        compare(args.compare, results, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start guard: import time of the entry-point modules.
+
+Each target runs in a fresh interpreter under `python -X importtime`. The
+script reports total import time (best of --runs) and the slowest top-level
+imports, and fails when a target exceeds its budget or pulls in a heavy
+dependency (torch, sentence-transformers, Gemini SDK) at import time.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 800 --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+TARGETS = {
+    "main.py --help": ["main.py", "--help"],
+    "pipeline": ["-c", "import pipeline"],
+    "recommender.course_ranker": ["-c", "import recommender.course_ranker"],
+    "recommender.course_matcher": ["-c", "import recommender.course_matcher"],
+    "utils.skills_extractor": ["-c", "import utils.skills_extractor"],
+    "utils.fetch_courses": ["-c", "import utils.fetch_courses"],
+}
+
+# Must only be imported on first use, never by importing an entry point
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "google.generativeai")
+
+
+def parse_importtime(stderr):
+    """(top-level imports as (cumulative_us, name), every imported module name)"""
+    top_level, modules = [], set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        modules.add(name.strip())
+        # Nested imports are indented below their parent
+        if not name[1:].startswith(" "):
+            top_level.append((int(cumulative), name.strip()))
+    return top_level, modules
+
+
+def measure(args):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True, stdin=subprocess.DEVNULL,
+    )
+    top_level, modules = parse_importtime(proc.stderr)
+    error = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+    return top_level, modules, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1500, help="max import time per target")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per target (best is kept)")
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to show")
+    parser.add_argument("targets", nargs="*", help=f"subset of: {', '.join(TARGETS)}")
+    args = parser.parse_args()
+
+    failures = []
+    for target in args.targets or TARGETS:
+        best = None
+        for _ in range(args.runs):
+            top_level, modules, error = measure(TARGETS[target])
+            total_ms = sum(us for us, _ in top_level) / 1000
+            if best is None or total_ms < best[0]:
+                best = (total_ms, top_level, modules, error)
+        total_ms, top_level, modules, error = best
+
+        heavy_roots = [h for h in HEAVY_MODULES if any(m == h or m.startswith(h + ".") for m in modules)]
+        over_budget = total_ms > args.budget_ms
+
+        status = "❌" if (error or heavy_roots or over_budget) else "✅"
+        print(f"{status} {target:<30} {total_ms:>8.1f} ms (budget {args.budget_ms:.0f} ms)")
+        for us, name in sorted(top_level, reverse=True)[:args.top]:
+            print(f"     {us / 1000:>8.1f} ms  {name}")
+
+        if error:
+            failures.append(f"{target}: {error}")
+        if heavy_roots:
+            failures.append(f"{target}: imports {', '.join(heavy_roots)} at startup")
+        if over_budget:
+            failures.append(f"{target}: {total_ms:.1f} ms > {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        print("\nStartup check failed:")
+        for failure in failures:
+            print(f" - {failure}")
+        sys.exit(1)
+    print("\n✅ All entry points within the startup budget")
+
+
+if __name__ == "__main__":
+    main()
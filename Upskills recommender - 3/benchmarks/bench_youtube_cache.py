@@ -0,0 +1,54 @@
+# benchmarks/bench_youtube_cache.py
+"""
+Measure YouTube fetch latency with a cold and a warm response cache,
+against the local fake API (no network or quota needed).
+
+Usage:
+    python benchmarks/bench_youtube_cache.py --skills 7 --latency 0.5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.fake_youtube import FakeYouTubeServer
+
+SKILLS = ["Python", "SQL", "Statistics", "Machine Learning", "Pandas", "Git", "Deep Learning",
+          "Docker", "Excel", "Tableau"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skills", type=int, default=7)
+    parser.add_argument("--latency", type=float, default=0.5, help="fake API latency per request (s)")
+    parser.add_argument("--runs", type=int, default=3, help="warm runs after the cold one")
+    args = parser.parse_args()
+
+    skills = [SKILLS[i % len(SKILLS)] + ("" if i < len(SKILLS) else f" {i}") for i in range(args.skills)]
+
+    with FakeYouTubeServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        # fetch_courses reads its configuration at import time
+        os.environ["YOUTUBE_SEARCH_URL"] = server.search_url
+        os.environ["YOUTUBE_API_KEY"] = "fake-key"
+        os.environ["YOUTUBE_CACHE_PATH"] = os.path.join(tmp, "youtube_cache.db")
+        os.environ.setdefault("YOUTUBE_REQUESTS_PER_SECOND", "100")
+        os.environ.setdefault("YOUTUBE_BURST", "100")
+        from utils.fetch_courses import get_youtube_cache, load_course_data_from_all_sources
+
+        print(f"{'run':>6} {'seconds':>9} {'api calls':>10}")
+        for run in range(args.runs + 1):
+            before = server.request_count
+            start = time.perf_counter()
+            load_course_data_from_all_sources(skills)
+            elapsed = time.perf_counter() - start
+            label = "cold" if run == 0 else f"warm{run}"
+            print(f"{label:>6} {elapsed:>9.3f} {server.request_count - before:>10}")
+
+        print("cache stats:", get_youtube_cache().stats)
+
+
+if __name__ == "__main__":
+    main()
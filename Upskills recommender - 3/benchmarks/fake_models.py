@@ -0,0 +1,97 @@
+# benchmarks/fake_models.py
+"""
+Deterministic stand-ins for the Gemini client and the embedding model,
+so the pipeline can be benchmarked offline and without model downloads.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+
+import numpy as np
+
+SKILL_POOL = [
+    "Python", "SQL", "Statistics", "Machine Learning", "Pandas", "Git", "Deep Learning",
+    "Docker", "Excel", "Tableau", "Spark", "JavaScript", "React", "Linux", "Data Visualization",
+    "Cloud Computing", "Communication", "Project Management", "Kubernetes", "TypeScript",
+]
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Mimics genai.GenerativeModel.generate_content with canned skill lists.
+    Answers both the single-goal prompt (comma-separated list) and the batched
+    prompt of utils.extraction_scheduler (JSON object of id -> skills).
+    """
+
+    def __init__(self, skills_per_goal=6, latency=0.0):
+        self.skills_per_goal = skills_per_goal
+        self.latency = latency
+        self.calls = 0
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def skills_for(self, goal):
+        """Deterministic skill list for a goal"""
+        seed = int(hashlib.md5(goal.encode("utf-8")).hexdigest(), 16)
+        count = min(self.skills_per_goal, len(SKILL_POOL))
+        start = seed % len(SKILL_POOL)
+        return [SKILL_POOL[(start + i) % len(SKILL_POOL)] for i in range(count)]
+
+    def generate_content(self, prompt):
+        batch = re.search(r"Goals \(JSON object of id -> goal\):\n(\{.*\})\n", prompt)
+        goals = json.loads(batch.group(1)) if batch else None
+        with self._lock:
+            self.calls += 1
+            self.batch_sizes.append(len(goals) if goals else 1)
+        if self.latency:
+            time.sleep(self.latency)
+        if goals:
+            return FakeResponse(json.dumps({i: self.skills_for(goal) for i, goal in goals.items()}))
+        match = re.search(r'The user says: "(.*)"', prompt)
+        goal = match.group(1) if match else prompt
+        return FakeResponse(", ".join(self.skills_for(goal)))
+
+
+class FakeEmbeddingModel:
+    """
+    Hashing bag-of-words encoder with the SentenceTransformer.encode signature.
+    Similar texts share tokens and therefore get similar vectors.
+    """
+
+    def __init__(self, dim=384, latency_per_text=0.0):
+        self.dim = dim
+        self.latency_per_text = latency_per_text
+        self.calls = 0
+        self.texts = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r"\w+", text.lower()):
+            digest = int(hashlib.md5(token.encode("utf-8")).hexdigest(), 16)
+            vector[digest % self.dim] += 1.0 if (digest >> 16) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, batch_size=32, convert_to_tensor=False, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        with self._lock:
+            self.calls += 1
+            self.texts += len(texts)
+        if self.latency_per_text:
+            time.sleep(self.latency_per_text * len(texts))
+
+        matrix = np.stack([self._vector(t) for t in texts]) if texts else np.zeros((0, self.dim), np.float32)
+        result = matrix[0] if single else matrix
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(result)
+        return result
@@ -0,0 +1,126 @@
+# benchmarks/fake_youtube.py
+"""
+Local stand-in for the YouTube Data API search endpoint.
+
+Serves deterministic results for /youtube/v3/search so the fetch and cache
+paths can be exercised offline. Point the app at it with:
+
+    with FakeYouTubeServer(latency=0.2) as server:
+        os.environ["YOUTUBE_SEARCH_URL"] = server.search_url
+        os.environ["YOUTUBE_API_KEY"] = "fake-key"
+        ...
+
+Faults can be injected (and changed while the server runs): a fraction of
+requests can fail with error_status (e.g. 503, or 403 for exhausted quota)
+and a fraction can be slow (slow_latency on top of latency).
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_search_response(query, max_results=3):
+    """Deterministic search payload for a query"""
+    items = []
+    for i in range(max_results):
+        video_id = hashlib.md5(f"{query}:{i}".encode("utf-8")).hexdigest()[:11]
+        items.append({
+            "id": {"kind": "youtube#video", "videoId": video_id},
+            "snippet": {
+                "title": f"{query.title()} - Part {i + 1}",
+                "description": f"A long-form video about {query}. Episode {i + 1}.",
+                "channelTitle": f"Channel {i + 1}",
+            },
+        })
+    return {"kind": "youtube#searchListResponse", "items": items}
+
+
+class FakeYouTubeServer:
+    """Threaded HTTP server answering YouTube search requests with canned data"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, error_status=503,
+                 slow_rate=0.0, slow_latency=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.request_count = 0
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self.queries = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def search_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/youtube/v3/search"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path != "/youtube/v3/search":
+                    self.send_error(404)
+                    return
+
+                params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                with server._lock:
+                    server.request_count += 1
+                    server.queries.append(params.get("q", ""))
+
+                status, payload = server.respond(params)
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (request deadline)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def respond(self, params):
+        """Return (status, payload) for a request; override to inject behaviour"""
+        if not params.get("key"):
+            return 403, {"error": {"code": 403, "message": "API key missing"}}
+        with self._lock:
+            fail = self._random.random() < self.error_rate
+            slow = self._random.random() < self.slow_rate
+            if fail:
+                self.error_count += 1
+        delay = self.latency + (self.slow_latency if slow else 0.0)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            return self.error_status, {"error": {"code": self.error_status, "message": "Injected failure"}}
+        return 200, fake_search_response(params.get("q", ""), int(params.get("maxResults", 3)))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
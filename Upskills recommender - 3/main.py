@@ -1,14 +1,14 @@
 # main.py
+import argparse
 import os
 from dotenv import load_dotenv
 load_dotenv()  # ✅ load the .env file early
 
-from agents.planner_agent import generate_learning_plan
-from recommender.course_matcher import match_courses
-from utils.fetch_courses import load_course_data_from_all_sources
-from utils.skills_extractor import extract_skills
 import json
 
+# The pipeline modules (Gemini, torch, sentence-transformers) are imported
+# inside the steps, so `python main.py --help` starts instantly
+
 
 # Step 1: Get user goal
 def get_user_goal():
@@ -18,18 +18,22 @@ def get_user_goal():
 
 # Step 2: Generate skill roadmap from goal
 def get_skills_from_goal(goal):
+    from utils.skills_extractor import extract_skills
     skills = extract_skills(goal)
     print(f"\nIdentified key skills: {skills}")
     return skills
 
 # Step 3: Match courses to skills
 def get_course_recommendations(skills):
+    from recommender.course_matcher import match_courses
+    from utils.fetch_courses import load_course_data_from_all_sources
     course_data = load_course_data_from_all_sources(skills)
     recommendations = match_courses(skills, course_data)
     return recommendations
 
 # Step 4: Display final learning plan
 def show_learning_plan(goal, skills, recommendations):
+    from agents.planner_agent import generate_learning_plan
     plan = generate_learning_plan(goal, skills, recommendations)
     print("\n=== Personalized Learning Plan ===")
     for week, content in plan.items():
@@ -37,8 +41,23 @@ def show_learning_plan(goal, skills, recommendations):
         for skill, course in content.items():
             print(f"- Learn {skill} via: {course['title']} ({course['url']})")
 
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Turn a career goal into skills, matched courses and a weekly learning plan."
+    )
+    parser.add_argument("--goal", help="career goal (prompted for if omitted)")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="don't load the embedding model in the background while prompting")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    user_goal = get_user_goal()
+    args = parse_args()
+    if not args.no_warmup:
+        # Load the model while the user types their goal
+        from recommender.model_registry import warm_up
+        warm_up()
+
+    user_goal = args.goal or get_user_goal()
     skills = get_skills_from_goal(user_goal)
     # Flatten and sanitize skill list
     flattened_skills = []
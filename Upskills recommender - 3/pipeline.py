@@ -0,0 +1,163 @@
+# pipeline.py
+"""
+Shared goal -> skills -> courses -> ranked plan pipeline used by the service entry points.
+"""
+from agents.planner_agent import generate_learning_plan, iter_learning_plan
+from recommender.course_ranker import clean_skill_name, iter_rank_all_skills
+from recommender.fallback_links import has_youtube_video
+from recommender.parallel_ranker import get_parallel_ranker
+from recommender.ranking_cache import get_ranking_cache, ranking_version
+from utils import metrics
+from utils.fetch_courses import (
+    LIVE_COURSE_FETCH, iter_course_data_from_all_sources, load_course_data_from_all_sources,
+)
+from utils.progress_store import get_progress_store
+from utils.skills_extractor import extract_skills, extract_skills_many
+
+
+def clean_skills(skills):
+    """Flatten, strip, title-case and de-duplicate a skill list"""
+    flattened_skills = []
+    for s in skills:
+        if isinstance(s, list):
+            flattened_skills.extend(x.strip().title() for x in s if isinstance(x, str))
+        elif isinstance(s, str):
+            flattened_skills.append(s.strip().title())
+
+    # Remove empty or duplicate values
+    return list(dict.fromkeys([s for s in flattened_skills if s]))
+
+
+def get_skills(goal):
+    """Extract and clean the skills for a goal"""
+    return clean_skills(extract_skills(goal))
+
+
+def get_skills_many(goals):
+    """Extract and clean the skills for several goals, batching the Gemini calls"""
+    return [clean_skills(skills) for skills in extract_skills_many(goals)]
+
+
+def lookup_rankings(skills):
+    """
+    Split skills into ({clean skill: cached ranking}, skills still to fetch and rank),
+    using the per-skill ranking cache shared across goals and processes.
+    """
+    cache = get_ranking_cache()
+    if cache is None:
+        return {}, list(skills)
+    cached = cache.get_many([clean_skill_name(skill) for skill in skills], ranking_version())
+    missing = [skill for skill in skills if clean_skill_name(skill) not in cached]
+    metrics.incr("ranking_cache_total", len(skills) - len(missing), result="hit")
+    metrics.incr("ranking_cache_total", len(missing), result="miss")
+    return cached, missing
+
+
+def store_rankings(ranked):
+    """
+    Save {clean skill: ranked courses} for later goals. With live fetching on,
+    rankings without a YouTube video (its searches failed, were skipped by the
+    circuit breaker or ran out of time) are not cached, so they are retried.
+    """
+    cache = get_ranking_cache()
+    if cache is not None:
+        complete = {
+            skill: courses for skill, courses in ranked.items()
+            if courses and (not LIVE_COURSE_FETCH or has_youtube_video(courses))
+        }
+        cache.set_many(complete, ranking_version())
+
+
+def rank_missing(skills, course_data, ranker=None):
+    """
+    Rank freshly fetched courses and add them to the ranking cache.
+    Ranks with `ranker` if given; otherwise the shared ParallelRanker shards
+    course lists of RANK_PARALLEL_MIN_COURSES or more across processes.
+    """
+    if ranker is None:
+        ranker = get_parallel_ranker()
+    ranked = ranker.rank_all_skills(skills, course_data)
+    store_rankings(ranked)
+    return ranked
+
+
+def recommend_courses(skills):
+    """Fetch courses for the skills and rank them per platform, reusing cached skill rankings"""
+    recommendations, missing = lookup_rankings(skills)
+    if missing:
+        course_data = load_course_data_from_all_sources(missing)
+        recommendations.update(rank_missing(missing, course_data))
+    return recommendations
+
+
+def recommendations_by_skill(skills, recommendations):
+    """
+    Map rankings keyed by clean skill name (as rank_all_skills returns them)
+    back to the skills as given, so skills like "Node.js" find theirs
+    """
+    return {
+        skill: recommendations.get(clean_skill_name(skill), recommendations.get(skill, []))
+        for skill in skills
+    }
+
+
+def build_plan(goal, skills, recommendations):
+    """Learning plan plus the inputs it was built from, in the export JSON shape"""
+    return {
+        "goal": goal,
+        "skills": skills,
+        "learning_plan": generate_learning_plan(goal, skills, recommendations_by_skill(skills, recommendations)),
+    }
+
+
+def run_pipeline(goal, skills=None):
+    """Full pipeline for one goal; pass skills to skip extraction"""
+    skills = clean_skills(skills) if skills else get_skills(goal)
+    return build_plan(goal, skills, recommend_courses(skills))
+
+
+def build_user_plan(user_id, goal, skills=None):
+    """
+    Plan for a stored learner: skills they have completed are skipped, entries
+    from their earlier plans are reused, and only new skills are fetched and
+    ranked. The plan is appended to their plan history.
+    """
+    skills = clean_skills(skills) if skills else get_skills(goal)
+    store = get_progress_store()
+    remaining, previous = store.plan_inputs(user_id, skills)
+
+    new_skills = [skill for skill in remaining if skill not in previous]
+    recommendations = recommend_courses(new_skills) if new_skills else {}
+    plan = {
+        "goal": goal,
+        "skills": remaining,
+        "learning_plan": generate_learning_plan(
+            goal, remaining, recommendations_by_skill(remaining, recommendations), previous
+        ),
+    }
+    print(f"👤 Plan for '{user_id}': {len(skills) - len(remaining)} completed skills skipped, "
+          f"{len(previous)} weeks reused, {len(new_skills)} ranked")
+    plan["plan_id"] = store.save_plan(user_id, goal, remaining, plan["learning_plan"])
+    return plan
+
+
+def iter_recommendations(skills):
+    """
+    Yield (skill, ranked courses) in skill order: cached skills immediately,
+    the rest as each one is fetched and ranked.
+    """
+    cached, missing = lookup_rankings(skills)
+    ranked = iter_rank_all_skills(iter_course_data_from_all_sources(missing))
+    for skill in skills:
+        skill_clean = clean_skill_name(skill)
+        if skill_clean in cached:
+            yield skill, cached[skill_clean]
+            continue
+        _, courses = next(ranked)
+        store_rankings({skill_clean: courses})
+        yield skill, courses
+
+
+def iter_plan_weeks(goal, skills):
+    """Yield (week, week_data) as each skill is fetched and ranked, in week order"""
+    return iter_learning_plan(goal, iter_recommendations(skills))
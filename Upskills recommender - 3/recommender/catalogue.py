@@ -0,0 +1,412 @@
+# recommender/catalogue.py
+"""
+Local offline course catalogue with an approximate-nearest-neighbour index.
+
+Courses are imported from JSONL or Parquet into a catalogue directory:
+
+    courses.jsonl      one course per line, in id order (append-only)
+    vectors.f32        unit-normalized float32 embeddings, row i = course i
+    meta.json          model id, dimension, count, index state
+    ivf_*.npy / hnsw.bin   the ANN index
+
+Adding courses embeds only the new rows and updates the index in place, so
+the catalogue can grow incrementally. meta.json is written last; rows past
+its count (left by an interrupted add) are cut off when the catalogue opens. The IVF index is a coarse k-means
+quantizer over the vector memmap; hnswlib is used instead when installed and
+CATALOGUE_ANN_BACKEND=hnsw.
+
+Build from the command line:
+    python -m recommender.catalogue import courses.jsonl --dir memory/catalogue
+"""
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+
+from recommender.embedder import course_text, get_embeddings
+from recommender.model_registry import get_model_id
+
+DEFAULT_CATALOGUE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "memory", "catalogue")
+)
+
+# Below this size an exact scan is already sub-millisecond
+BRUTE_FORCE_LIMIT = 4096
+
+
+def _normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores, k):
+    """Indices of the k largest scores, best first"""
+    if len(scores) <= k:
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def read_courses(path):
+    """Read course records from a .jsonl or .parquet file"""
+    if path.endswith(".parquet"):
+        import pandas as pd  # optional dependency, only needed for Parquet
+        return pd.read_parquet(path).to_dict("records")
+
+    courses = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                courses.append(json.loads(line))
+    return courses
+
+
+class IVFIndex:
+    """Inverted-file index: k-means centroids, one id list per centroid"""
+
+    def __init__(self, directory, nprobe=8):
+        self.directory = directory
+        self.nprobe = nprobe
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.lists = []
+        self.trained_size = 0
+        self._load()
+
+    def _paths(self):
+        return (os.path.join(self.directory, "ivf_centroids.npy"),
+                os.path.join(self.directory, "ivf_assignments.npy"))
+
+    def _load(self):
+        centroids_path, assignments_path = self._paths()
+        if os.path.exists(centroids_path) and os.path.exists(assignments_path):
+            self.centroids = np.load(centroids_path)
+            self.assignments = np.load(assignments_path)
+            self.trained_size = len(self.assignments)
+            self._rebuild_lists()
+
+    def truncate(self, size):
+        """Forget assignments past the first `size` vectors"""
+        if len(self.assignments) > size:
+            self.assignments = self.assignments[:size]
+            self._rebuild_lists()
+
+    def save(self):
+        if self.centroids is None:
+            return
+        centroids_path, assignments_path = self._paths()
+        np.save(centroids_path, self.centroids)
+        np.save(assignments_path, self.assignments)
+
+    def _rebuild_lists(self):
+        self.lists = [[] for _ in range(len(self.centroids))]
+        for course_id, cell in enumerate(self.assignments.tolist()):
+            self.lists[cell].append(course_id)
+        self.lists = [np.array(ids, dtype=np.int64) for ids in self.lists]
+
+    def needs_training(self, size):
+        # Retrain once the catalogue has grown 4x past the last training run
+        return size > BRUTE_FORCE_LIMIT and (self.centroids is None or size > 4 * self.trained_size)
+
+    def train(self, vectors, iterations=10, seed=0):
+        """Fit centroids with spherical k-means and assign every vector"""
+        n = len(vectors)
+        nlist = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(vectors[rng.choice(n, size=min(n, nlist * 64), replace=False)])
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iterations):
+            cells = np.argmax(sample @ centroids.T, axis=1)
+            for cell in range(nlist):
+                members = sample[cells == cell]
+                if len(members):
+                    centroids[cell] = members.mean(axis=0)
+            centroids = _normalize_rows(centroids)
+
+        self.centroids = centroids
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.add(vectors)
+        self.trained_size = n
+
+    def add(self, vectors, chunk=8192):
+        """Assign new vectors (appended after the existing ones) to their nearest cell"""
+        if self.centroids is None:
+            return
+        cells = [
+            np.argmax(np.asarray(vectors[start:start + chunk]) @ self.centroids.T, axis=1)
+            for start in range(0, len(vectors), chunk)
+        ]
+        new = np.concatenate(cells).astype(np.int32) if cells else np.zeros(0, dtype=np.int32)
+        self.assignments = np.concatenate([self.assignments, new])
+        self._rebuild_lists()
+
+    def search(self, vectors, queries, k):
+        results = []
+        for query in queries:
+            cells = _top_k(self.centroids @ query, min(self.nprobe, len(self.centroids)))
+            ids = np.concatenate([self.lists[cell] for cell in cells])
+            if len(ids) == 0:
+                results.append([])
+                continue
+            scores = np.asarray(vectors[ids]) @ query
+            top = _top_k(scores, k)
+            results.append([(int(ids[i]), float(scores[i])) for i in top])
+        return results
+
+
+class HNSWIndex:
+    """Thin wrapper around hnswlib (optional dependency)"""
+
+    def __init__(self, directory, dim, ef=64):
+        import hnswlib
+
+        self.path = os.path.join(directory, "hnsw.bin")
+        self.index = hnswlib.Index(space="ip", dim=dim)
+        if os.path.exists(self.path):
+            self.index.load_index(self.path)
+        else:
+            self.index.init_index(max_elements=1024, ef_construction=200, M=16)
+        self.index.set_ef(ef)
+
+    def __len__(self):
+        return self.index.get_current_count()
+
+    def add(self, vectors, start_id):
+        needed = start_id + len(vectors)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+        self.index.add_items(np.asarray(vectors), np.arange(start_id, needed))
+
+    def save(self):
+        self.index.save_index(self.path)
+
+    def search(self, queries, k):
+        k = min(k, self.index.get_current_count())
+        if k == 0:
+            return [[] for _ in queries]
+        labels, distances = self.index.knn_query(queries, k=k)
+        # hnswlib's "ip" distance is 1 - dot product
+        return [
+            [(int(label), float(1.0 - dist)) for label, dist in zip(row_labels, row_dists)]
+            for row_labels, row_dists in zip(labels, distances)
+        ]
+
+
+class CourseCatalogue:
+    """Course records plus their embeddings and an ANN index, stored in one directory"""
+
+    def __init__(self, directory=DEFAULT_CATALOGUE_DIR, backend=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+        # "model_name" holds the model id, so vectors of different backends never mix
+        self.meta = {"model_name": get_model_id(), "dim": None, "count": 0}
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+            if self.meta["model_name"] != get_model_id():
+                raise ValueError(
+                    f"Catalogue was built with '{self.meta['model_name']}', "
+                    f"but the configured model is '{get_model_id()}'; rebuild it"
+                )
+        self._drop_unsaved_rows()
+
+        self.courses = []
+        courses_path = os.path.join(directory, "courses.jsonl")
+        if os.path.exists(courses_path):
+            self.courses = read_courses(courses_path)[:self.meta["count"]]
+        self._urls = {course.get("url") for course in self.courses}
+
+        self.vectors = None
+        self._open_vectors()
+
+        self.backend = (backend or os.getenv("CATALOGUE_ANN_BACKEND", "ivf")).lower()
+        self._ivf = IVFIndex(directory)
+        self._ivf.truncate(len(self.courses))
+        self._hnsw = None
+        if self.backend == "hnsw" and self.meta["dim"]:
+            self._open_hnsw()
+
+    def __len__(self):
+        return len(self.courses)
+
+    @property
+    def version(self):
+        """Changes whenever the catalogue contents or embedding model change"""
+        return f"{self.meta['model_name']}:{len(self.courses)}"
+
+    def _drop_unsaved_rows(self):
+        """Truncate courses.jsonl and vectors.f32 to the rows counted in meta.json"""
+        count = self.meta["count"]
+        courses_path = os.path.join(self.directory, "courses.jsonl")
+        if os.path.exists(courses_path):
+            with open(courses_path, "rb+") as f:
+                rows = 0
+                while rows < count:
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.strip():
+                        rows += 1
+                f.truncate(f.tell())
+
+        vectors_path = os.path.join(self.directory, "vectors.f32")
+        size = count * (self.meta["dim"] or 0) * np.dtype(np.float32).itemsize
+        if os.path.exists(vectors_path) and os.path.getsize(vectors_path) > size:
+            with open(vectors_path, "rb+") as f:
+                f.truncate(size)
+
+    def _open_hnsw(self):
+        """Load hnsw.bin, building it from the stored vectors if it is missing or out of date"""
+        path = os.path.join(self.directory, "hnsw.bin")
+        self._hnsw = HNSWIndex(self.directory, self.meta["dim"])
+        if len(self._hnsw) > len(self.courses):
+            # Holds rows that were cut off as unsaved; start over
+            os.remove(path)
+            self._hnsw = HNSWIndex(self.directory, self.meta["dim"])
+        built = len(self._hnsw)
+        if built < len(self.courses):
+            print(f"🔄 Building HNSW index over {len(self.courses) - built} courses...")
+            for start in range(built, len(self.courses), 8192):
+                self._hnsw.add(self.vectors[start:start + 8192], start)
+            self._hnsw.save()
+
+    def _open_vectors(self):
+        path = os.path.join(self.directory, "vectors.f32")
+        if self.meta["count"] and os.path.exists(path):
+            self.vectors = np.memmap(path, dtype=np.float32, mode="r",
+                                     shape=(self.meta["count"], self.meta["dim"]))
+
+    def _save_meta(self):
+        with open(os.path.join(self.directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+
+    def add_courses(self, courses, batch_size=256):
+        """Append new courses (deduplicated by URL), embedding only the new rows"""
+        with self._lock:
+            new_courses = []
+            for course in courses:
+                url = course.get("url")
+                if url and url in self._urls:
+                    continue
+                self._urls.add(url)
+                new_courses.append(dict(course))
+            if not new_courses:
+                return 0
+
+            start_id = len(self.courses)
+            vectors = _normalize_rows(
+                get_embeddings([course_text(c) for c in new_courses], batch_size=batch_size)
+            )
+
+            with open(os.path.join(self.directory, "courses.jsonl"), "a", encoding="utf-8") as f:
+                for course in new_courses:
+                    f.write(json.dumps(course, default=str) + "\n")
+            with open(os.path.join(self.directory, "vectors.f32"), "ab") as f:
+                f.write(vectors.tobytes())
+
+            self.courses.extend(new_courses)
+            self.meta["dim"] = int(vectors.shape[1])
+            self.meta["count"] = len(self.courses)
+            self._open_vectors()
+
+            if self.backend == "hnsw":
+                if self._hnsw is None:
+                    self._open_hnsw()  # also indexes the rows just appended
+                else:
+                    self._hnsw.add(vectors, start_id)
+                    self._hnsw.save()
+            elif self._ivf.needs_training(len(self.courses)):
+                print(f"🔄 Training IVF index over {len(self.courses)} courses...")
+                self._ivf.train(self.vectors)
+                self._ivf.save()
+            elif self._ivf.centroids is not None:
+                self._ivf.add(vectors)
+                self._ivf.save()
+
+            self._save_meta()
+            print(f"✅ Added {len(new_courses)} courses to the catalogue ({len(self.courses)} total)")
+            return len(new_courses)
+
+    def import_file(self, path):
+        """Import courses from a JSONL or Parquet file"""
+        return self.add_courses(read_courses(path))
+
+    def search(self, query_vectors, k=10):
+        """Top-k (course_id, cosine score) lists, one per query vector"""
+        if not self.courses:
+            return [[] for _ in range(len(query_vectors))]
+
+        queries = _normalize_rows(np.atleast_2d(query_vectors))
+        if self._hnsw is not None:
+            return self._hnsw.search(queries, k)
+        if self._ivf.centroids is not None and len(self._ivf.assignments) == len(self.courses):
+            return self._ivf.search(self.vectors, queries, k)
+
+        # Exact scan for small catalogues
+        scores = queries @ np.asarray(self.vectors).T
+        results = []
+        for row in scores:
+            top = _top_k(row, k)
+            results.append([(int(i), float(row[i])) for i in top])
+        return results
+
+    def search_text(self, texts, k=10):
+        """Top-k (course, score) lists for each query text"""
+        hits = self.search(get_embeddings(texts), k)
+        return [[(self.courses[i], score) for i, score in row] for row in hits]
+
+    def courses_for_skills(self, skills, k=10):
+        """Top-k catalogue courses per skill, tagged with that skill"""
+        courses = {}
+        for skill, hits in zip(skills, self.search_text(skills, k)):
+            courses[skill] = [dict(course, skill=skill, is_search_link=False) for course, _ in hits]
+        return courses
+
+
+_default_catalogue = None
+_default_lock = threading.Lock()
+
+
+def get_default_catalogue():
+    """
+    Catalogue from COURSE_CATALOGUE_DIR, or None when no catalogue is configured.
+    """
+    global _default_catalogue
+    directory = os.getenv("COURSE_CATALOGUE_DIR")
+    if not directory or not os.path.exists(os.path.join(directory, "meta.json")):
+        return None
+    if _default_catalogue is None:
+        with _default_lock:
+            if _default_catalogue is None:
+                _default_catalogue = CourseCatalogue(directory)
+    return _default_catalogue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local course catalogue")
+    parser.add_argument("command", choices=["import", "search", "info"])
+    parser.add_argument("args", nargs="*", help="files to import, or query text")
+    parser.add_argument("--dir", default=os.getenv("COURSE_CATALOGUE_DIR", DEFAULT_CATALOGUE_DIR))
+    parser.add_argument("-k", type=int, default=5)
+    options = parser.parse_args()
+
+    catalogue = CourseCatalogue(options.dir)
+    if options.command == "import":
+        for path in options.args:
+            catalogue.import_file(path)
+    elif options.command == "search":
+        for course, score in catalogue.search_text([" ".join(options.args)], options.k)[0]:
+            print(f"{score:.3f}  {course.get('title', '')}  {course.get('url', '')}")
+    print(f"📚 Catalogue {options.dir}: {len(catalogue)} courses, version {catalogue.version}")
+
+
+if __name__ == "__main__":
+    main()
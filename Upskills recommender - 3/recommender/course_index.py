@@ -0,0 +1,105 @@
+# recommender/course_index.py
+"""
+Inverted index from skill tokens to courses.
+
+Built once per course list so that finding a skill's candidate courses is a
+few set lookups instead of a scan over every title and description. Platforms
+left with fewer than a given number of token matches fall back to substring
+matching over their own courses, so embedded skills ("Sql" in "MySQL") are
+still found.
+"""
+import re
+from collections import Counter, defaultdict
+
+from recommender.course_model import Course
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lowercased word tokens of a string"""
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+def normalize_skill(skill):
+    """Skill key with punctuation removed, matching clean_skill_name()"""
+    return " ".join(re.sub(r"[^\w\s]", "", str(skill)).lower().split())
+
+
+class CourseIndex:
+    """Maps the `skill` field and title/description tokens to course ids"""
+
+    def __init__(self, courses=()):
+        self.courses = []
+        self._by_skill = defaultdict(set)
+        self._by_title_token = defaultdict(set)
+        self._by_description_token = defaultdict(set)
+        self._by_source = defaultdict(list)
+        self.add_all(courses)
+
+    def __len__(self):
+        return len(self.courses)
+
+    def add(self, course):
+        """Index one course (stored as a Course) and return its id"""
+        course = Course.from_dict(course)
+        course_id = len(self.courses)
+        self.courses.append(course)
+
+        self._by_skill[normalize_skill(course.skill or "")].add(course_id)
+        self._by_source[(course.source or "").lower()].append(course_id)
+        for token in set(_TOKEN_RE.findall(course.title_lower)):
+            self._by_title_token[token].add(course_id)
+        for token in set(_TOKEN_RE.findall(course.description_lower)):
+            self._by_description_token[token].add(course_id)
+        return course_id
+
+    def add_all(self, courses):
+        for course in courses:
+            self.add(course)
+
+    def candidate_ids(self, skill, min_per_platform=0):
+        """
+        Ids of courses relevant to a skill: the course's skill field matches,
+        any skill word appears in the title, or all skill words appear in the
+        description. Platforms with fewer than min_per_platform such courses
+        also get their courses that contain the skill, or in the title any
+        skill word, as a substring.
+        """
+        words = tokenize(skill)
+
+        ids = set(self._by_skill.get(normalize_skill(skill), ()))
+        for word in words:
+            ids |= self._by_title_token.get(word, set())
+
+        if words:
+            postings = [self._by_description_token.get(word, set()) for word in words]
+            ids |= set.intersection(*postings)
+
+        if min_per_platform:
+            counts = self.platform_counts(ids)
+            for source, source_ids in self._by_source.items():
+                if counts[source] < min_per_platform:
+                    ids.update(self._substring_ids(skill, source_ids))
+        return sorted(ids)
+
+    def _substring_ids(self, skill, ids):
+        """The linear filter the index replaces, over the given ids"""
+        skill_lower = skill.lower()
+        words = skill_lower.split()
+        for i in ids:
+            course = self.courses[i]
+            title = course.title_lower
+            if ((course.skill or "").lower() == skill_lower
+                    or skill_lower in title
+                    or skill_lower in course.description_lower
+                    or any(word in title for word in words)):
+                yield i
+
+    def platform_counts(self, ids):
+        """Number of the given courses per lowercased source"""
+        return Counter((self.courses[i].source or "").lower() for i in ids)
+
+    def candidates(self, skill, min_per_platform=0):
+        """Candidate courses for a skill, in catalogue order"""
+        return [self.courses[i] for i in self.candidate_ids(skill, min_per_platform)]
@@ -1,42 +1,68 @@
-# recommender/course_matcher.py
-
-from sentence_transformers import SentenceTransformer, util
-
-# Load sentence embedding model
-model = SentenceTransformer('all-MiniLM-L6-v2')
-
-def embed_text(text):
-    return model.encode(text, convert_to_tensor=True)
-
-def match_courses(skills, courses):
-    """
-    Match each skill to the most semantically similar course title+description
-    """
-    recommendations = {}
-
-    for skill in skills:
-        skill_embedding = embed_text(skill)
-        best_score = -1
-        best_course = None
-
-        for course in courses:
-            course_text = f"{course.get('title', '')} {course.get('description', '')}"
-            course_embedding = embed_text(course_text)
-            similarity = util.pytorch_cos_sim(skill_embedding, course_embedding)[0][0].item()
-
-            if similarity > best_score:
-                best_score = similarity
-                best_course = course
-
-        if best_course:
-            recommendations[skill] = {
-                "title": best_course.get("title", "Unknown"),
-                "url": best_course.get("url", "#")
-            }
-        else:
-            recommendations[skill] = {
-                "title": "No matching course found",
-                "url": "#"
-            }
-
-    return recommendations
+# recommender/course_matcher.py
+
+# torch and sentence_transformers are imported inside the functions so that
+# importing this module doesn't pay their multi-second import cost
+from recommender.embedder import course_text, get_embeddings
+
+def embed_texts(texts, batch_size=None):
+    """
+    Encode a list of strings in a single batched forward pass.
+    Texts already in the embedding cache skip the model.
+    """
+    import torch
+    return torch.from_numpy(get_embeddings(texts, batch_size=batch_size))
+
+def match_courses_top_k(skills, courses, k=3, catalogue=None):
+    """
+    Return the k most similar courses for every skill as (course, score) pairs.
+    If a CourseCatalogue is given, its nearest neighbours compete with the courses.
+    """
+    if not skills:
+        return {}
+
+    matches = {skill: [] for skill in skills}
+    skill_embeddings = embed_texts(skills)
+
+    if courses:
+        from sentence_transformers import util
+
+        course_embeddings = embed_texts([course_text(c) for c in courses])
+        scores = util.cos_sim(skill_embeddings, course_embeddings)
+        top_scores, top_indices = scores.topk(min(k, len(courses)), dim=1)
+        for row, skill in enumerate(skills):
+            matches[skill] = [
+                (courses[idx], score)
+                for idx, score in zip(top_indices[row].tolist(), top_scores[row].tolist())
+            ]
+
+    if catalogue is not None:
+        hits = catalogue.search(skill_embeddings.numpy(), k)
+        for skill, row in zip(skills, hits):
+            merged = matches[skill] + [(catalogue.courses[i], score) for i, score in row]
+            merged.sort(key=lambda pair: pair[1], reverse=True)
+            matches[skill] = merged[:k]
+
+    return matches
+
+def match_courses(skills, courses, catalogue=None):
+    """
+    Match each skill to the most semantically similar course title+description
+    """
+    recommendations = {}
+    matches = match_courses_top_k(skills, courses, k=1, catalogue=catalogue)
+
+    for skill in skills:
+        best = matches.get(skill)
+        if best:
+            best_course = best[0][0]
+            recommendations[skill] = {
+                "title": best_course.get("title", "Unknown"),
+                "url": best_course.get("url", "#")
+            }
+        else:
+            recommendations[skill] = {
+                "title": "No matching course found",
+                "url": "#"
+            }
+
+    return recommendations
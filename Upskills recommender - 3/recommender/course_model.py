@@ -0,0 +1,140 @@
+# recommender/course_model.py
+"""
+Compact course representations.
+
+Course is a __slots__ record that still behaves like the course dicts used
+throughout the pipeline (get(), [], in, keys()) and serializes back to the
+same JSON shape with to_dict(): fields that were never set are left out.
+Source strings are interned, and lowercased title/description/text are
+computed once and cached.
+
+CourseTable is a columnar view over a list of courses for scoring: source
+codes in a NumPy int8 array plus the cached normalized text columns.
+"""
+import sys
+
+import numpy as np
+
+# Source code table; unknown sources map to OTHER_SOURCE
+SOURCE_NAMES = ("youtube", "coursera", "udemy", "google", "edx", "khan-academy", "other")
+SOURCE_CODES = {name: code for code, name in enumerate(SOURCE_NAMES)}
+OTHER_SOURCE = SOURCE_CODES["other"]
+
+_FIELDS = ("title", "description", "url", "source", "duration", "skill", "is_search_link", "channel")
+
+
+class Course:
+    """One course, with dict-style access and cached normalized text"""
+
+    __slots__ = _FIELDS + ("extra", "_title_lower", "_description_lower", "_text")
+
+    def __init__(self, title=None, description=None, url=None, source=None, duration=None,
+                 skill=None, is_search_link=None, channel=None, **extra):
+        self.title = title
+        self.description = description
+        self.url = url
+        self.source = sys.intern(source) if isinstance(source, str) else source
+        self.duration = duration
+        self.skill = skill
+        self.is_search_link = is_search_link
+        self.channel = channel
+        self.extra = extra or None
+        self._title_lower = None
+        self._description_lower = None
+        self._text = None
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, Course):
+            return data
+        return cls(**data)
+
+    # --- cached normalized text ------------------------------------------
+
+    @property
+    def title_lower(self):
+        if self._title_lower is None:
+            self._title_lower = (self.title or "").lower()
+        return self._title_lower
+
+    @property
+    def description_lower(self):
+        if self._description_lower is None:
+            self._description_lower = (self.description or "").lower()
+        return self._description_lower
+
+    @property
+    def text(self):
+        """Text used to represent the course for semantic matching"""
+        if self._text is None:
+            self._text = f"{self.title or ''} {self.description or ''}"
+        return self._text
+
+    @property
+    def source_code(self):
+        return SOURCE_CODES.get((self.source or "").lower(), OTHER_SOURCE)
+
+    # --- dict compatibility ----------------------------------------------
+
+    def keys(self):
+        keys = [name for name in _FIELDS if getattr(self, name) is not None]
+        if self.extra:
+            keys.extend(self.extra)
+        return keys
+
+    def __getitem__(self, key):
+        if key in _FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """Plain dict in the original course JSON shape"""
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, (Course, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Course({self.to_dict()!r})"
+
+
+class CourseTable:
+    """Columnar view of a course list used by the vectorized scorer"""
+
+    __slots__ = ("courses", "titles_lower", "skills_lower", "texts", "source_codes")
+
+    def __init__(self, courses):
+        self.courses = [Course.from_dict(course) for course in courses]
+        self.titles_lower = [course.title_lower for course in self.courses]
+        self.skills_lower = [(course.skill or "").lower() for course in self.courses]
+        self.texts = [course.text for course in self.courses]
+        self.source_codes = np.fromiter(
+            (course.source_code for course in self.courses), dtype=np.int8, count=len(self.courses)
+        )
+
+    def __len__(self):
+        return len(self.courses)
+
+    def source_mask(self, source):
+        return self.source_codes == SOURCE_CODES.get(source, OTHER_SOURCE)
@@ -1,9 +1,36 @@
 # recommender/course_ranker.py
 
-from recommender.embedder import get_embedding
-from sentence_transformers.util import pytorch_cos_sim
+from recommender.course_index import CourseIndex
+from recommender.course_model import SOURCE_NAMES, CourseTable
+from recommender.embedder import course_text, get_embeddings
+from recommender.fallback_links import CACHE_SIZE, fallback_recommendation
+from utils import metrics
+from functools import lru_cache
+import heapq
+import numpy as np
+import os
 import re
 
+# Source preference (YouTube gets higher score for being real content)
+SOURCE_BONUS = {
+    "youtube": 0.8,      # Real video content
+    "coursera": 0.6,     # Search links
+    "udemy": 0.6,        # Search links
+    "google": 0.4,       # General search
+    "edx": 0.5,          # Alternative platform
+    "khan-academy": 0.5  # Alternative platform
+}
+DEFAULT_SOURCE_BONUS = 0.4
+SEMANTIC_WEIGHT = 0.3
+# Courses kept per platform (the best one plus alternatives) and MMR trade-off:
+# 1.0 ranks purely by relevance, lower values favour diverse alternatives
+TOP_K_PER_PLATFORM = max(1, int(os.getenv("RANK_TOP_K_PER_PLATFORM", 3)))
+MMR_LAMBDA = float(os.getenv("RANK_MMR_LAMBDA", 0.7))
+MMR_POOL_FACTOR = 3  # candidates considered by MMR per selected course
+PLATFORMS = ["coursera", "udemy", "youtube"]
+# SOURCE_BONUS indexed by CourseTable source code
+_SOURCE_BONUS_BY_CODE = np.array([SOURCE_BONUS.get(name, DEFAULT_SOURCE_BONUS) for name in SOURCE_NAMES])
+
 def clean_skill_name(skill):
     """Clean and normalize skill names"""
     if not isinstance(skill, str):
@@ -14,158 +41,303 @@ def clean_skill_name(skill):
     skill = skill.strip().title()
     return skill
 
-def calculate_course_score(skill, course):
-    """Calculate relevance score for a course given a skill"""
+def _cosine_to(matrix, vector):
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+    return (matrix @ vector) / np.maximum(norms, 1e-12)
+
+def score_courses(skill, courses, skill_embedding=None, course_embeddings=None):
+    """
+    Vectorized relevance scores for a list of courses (or a CourseTable) given a skill.
+    course_embeddings, if given, is aligned with courses; only the rows of
+    YouTube courses are used. Missing embeddings are computed in one batch.
+    Synthetic search links (not YouTube) take a memoized score instead.
+    """
+    table = courses if isinstance(courses, CourseTable) else CourseTable(courses)
+    synthetic = np.fromiter(
+        (course.is_search_link is True for course in table.courses), dtype=bool, count=len(table)
+    ) & ~table.source_mask("youtube")
+    if not synthetic.any():
+        return _score_table(skill, table, skill_embedding, course_embeddings)
+
+    scores = np.empty(len(table))
+    skill_key = clean_skill_name(skill).lower()
+    for row in np.flatnonzero(synthetic):
+        scores[row] = _search_link_score(
+            skill_key, table.titles_lower[row], table.skills_lower[row], int(table.source_codes[row])
+        )
+    rows = np.flatnonzero(~synthetic)
+    if len(rows):
+        real = CourseTable([table.courses[row] for row in rows])
+        embeddings = None if course_embeddings is None else np.asarray(course_embeddings)[rows]
+        scores[rows] = _score_table(skill, real, skill_embedding, embeddings)
+    return scores
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _search_link_score(skill_key, title_lower, skill_field_lower, source_code):
+    """
+    Score of a non-YouTube search link: needs no embedding, only these fields.
+    skill_key is the clean, lowercased skill name, so "Python" and "python" share entries.
+    """
+    link = {"title": title_lower, "skill": skill_field_lower, "source": SOURCE_NAMES[source_code]}
+    return float(_score_table(skill_key, CourseTable([link]))[0])
+
+def _score_table(skill, table, skill_embedding=None, course_embeddings=None):
+    n = len(table)
+    if n == 0:
+        return np.zeros(0)
+
     skill_lower = skill.lower()
-    title = course.get("title", "").lower()
-    description = course.get("description", "").lower()
-    
-    # 1. Exact skill match in title or description
-    exact_match = 0.5 if skill_lower in title else 0.0
-    
+    skill_words = skill_lower.split()
+    titles = table.titles_lower
+
+    def flags(values):
+        return np.fromiter(values, dtype=bool, count=n)
+
+    # 1. Exact skill match in title
+    exact_match = 0.5 * flags(skill_lower in title for title in titles)
+
     # 2. Partial skill match bonus
-    partial_match = 0.3 if any(word in title for word in skill_lower.split()) else 0.0
-    
-    # 3. Source preference (YouTube gets higher score for being real content)
-    source = course.get("source", "").lower()
-    source_bonus = {
-        "youtube": 0.8,      # Real video content
-        "coursera": 0.6,     # Search links
-        "udemy": 0.6,        # Search links
-        "google": 0.4,       # General search
-        "edx": 0.5,          # Alternative platform
-        "khan-academy": 0.5  # Alternative platform
-    }.get(source, 0.4)
-    
+    partial_match = 0.3 * flags(any(word in title for word in skill_words) for title in titles)
+
+    # 3. Source preference
+    source_bonus = _SOURCE_BONUS_BY_CODE[table.source_codes]
 
     # 4. Course type bonus
-    type_bonus = 0.0
-    if "complete" in title or "full course" in title:
-        type_bonus += 0.2
-    if "tutorial" in title:
-        type_bonus += 0.1
-    if "search" in title.lower():
-        type_bonus -= 0.1  # Slightly lower for search results
-    
-    # 5. Skill-specific matching for YouTube content
-    if source == "youtube":
+    type_bonus = (
+        0.2 * flags("complete" in title or "full course" in title for title in titles)
+        + 0.1 * flags("tutorial" in title for title in titles)
+        - 0.1 * flags("search" in title for title in titles)  # Slightly lower for search results
+    )
+
+    # 5. For search links, use exact matching on the skill field
+    semantic_bonus = 0.2 * flags(skill_lower in course_skill for course_skill in table.skills_lower)
+
+    # ... and semantic similarity for YouTube videos (real content)
+    is_youtube = table.source_mask("youtube")
+    semantic_bonus[is_youtube] = 0.0
+    if is_youtube.any():
+        youtube_rows = np.flatnonzero(is_youtube)
         try:
-            # Use semantic similarity for YouTube videos (real content)
-            skill_embedding = get_embedding(skill)
-            course_text = f"{course.get('title', '')} {course.get('description', '')}"
-            course_embedding = get_embedding(course_text)
-            similarity = pytorch_cos_sim(skill_embedding, course_embedding)[0][0].item()
-            semantic_bonus = similarity * 0.3
-        except:
-            semantic_bonus = 0.0
-    else:
-        # For search links, use exact matching
-        semantic_bonus = 0.2 if skill_lower in course.get("skill", "").lower() else 0.0
-    
+            if skill_embedding is None:
+                skill_embedding = get_embeddings([skill])[0]
+            if course_embeddings is None:
+                youtube_embeddings = get_embeddings([table.texts[i] for i in youtube_rows])
+            else:
+                youtube_embeddings = np.asarray(course_embeddings)[youtube_rows]
+            similarity = _cosine_to(youtube_embeddings, np.asarray(skill_embedding))
+            semantic_bonus[youtube_rows] = SEMANTIC_WEIGHT * similarity
+        except Exception as e:
+            print(f"⚠️ Semantic scoring failed for '{skill}': {e}")
+
     final_score = exact_match + partial_match + source_bonus + type_bonus + semantic_bonus
-    return max(0.0, min(1.0, final_score))  # Clamp between 0 and 1
-
-def get_best_courses_per_platform(skill, courses):
-    """Get the best course from each platform for a skill"""
-    platform_best = {
-        "coursera": {"score": -1, "course": None},
-        "udemy": {"score": -1, "course": None},
-        "youtube": {"score": -1, "course": None}
+    return np.clip(final_score, 0.0, 1.0)  # Clamp between 0 and 1
+
+def calculate_course_score(skill, course):
+    """Calculate relevance score for a course given a skill"""
+    return float(score_courses(skill, [course])[0])
+
+def _mmr_order(rows, scores, embeddings, k, mmr_lambda):
+    """
+    Pick k of the candidate rows (sorted by score) by maximal marginal relevance:
+    each next pick maximizes lambda * relevance - (1 - lambda) * max similarity
+    to the rows already picked. Rows without an embedding (all zeros) never
+    count as redundant.
+    """
+    k = min(k, len(rows))
+    if embeddings is None or k <= 1 or mmr_lambda >= 1.0:
+        return rows[:k]
+
+    vectors = np.asarray(embeddings, dtype=np.float32)[rows]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    similarity = unit @ unit.T
+    relevance = scores[rows]
+
+    chosen = [0]
+    available = np.ones(len(rows), dtype=bool)
+    available[0] = False
+    redundancy = similarity[0].copy()
+    while len(chosen) < k:
+        mmr = mmr_lambda * relevance - (1 - mmr_lambda) * redundancy
+        mmr[~available] = -np.inf
+        best = int(np.argmax(mmr))
+        chosen.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    return [rows[i] for i in chosen]
+
+def get_top_courses_per_platform(skill, courses, k=None, skill_embedding=None, course_embeddings=None,
+                                 mmr_lambda=None):
+    """
+    Top-k courses per platform as {platform: [(course, score), ...]}.
+    Candidates are picked with a heap, then re-ranked by MMR over course_embeddings
+    (the embeddings already computed for scoring) so alternatives aren't near-duplicates.
+    """
+    k = TOP_K_PER_PLATFORM if k is None else k
+    mmr_lambda = MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+
+    table = CourseTable(courses)
+    scores = score_courses(skill, table, skill_embedding, course_embeddings)
+
+    top = {}
+    for platform in PLATFORMS:
+        rows = np.flatnonzero(table.source_mask(platform)).tolist()
+        if not rows:
+            continue
+        pool = heapq.nlargest(k * MMR_POOL_FACTOR, rows, key=scores.__getitem__)
+        ordered = _mmr_order(pool, scores, course_embeddings, k, mmr_lambda)
+        top[platform] = [(table.courses[row], float(scores[row])) for row in ordered]
+    return top
+
+def _recommendation(course, platform, score):
+    return {
+        "title": course["title"],
+        "url": course["url"],
+        "source": platform,
+        "duration": course.get("duration", ""),
+        "description": course.get("description", ""),
+        "relevance_score": score
     }
-    
-    for course in courses:
-        source = course.get("source", "").lower()
-        if source in platform_best:
-            score = calculate_course_score(skill, course)
-            if score > platform_best[source]["score"]:
-                platform_best[source] = {"score": score, "course": course}
-    
+
+def get_best_courses_per_platform(skill, courses, skill_embedding=None, course_embeddings=None, k=None):
+    """
+    Get the best course from each platform for a skill.
+    The other top-k courses of that platform are attached as "alternatives".
+    """
+    top = get_top_courses_per_platform(skill, courses, k, skill_embedding, course_embeddings)
+
     # Prepare final recommendations
     recommendations = []
-    for platform in ["coursera", "udemy", "youtube"]:
-        if platform_best[platform]["course"]:
-            course = platform_best[platform]["course"]
-            recommendations.append({
-                "title": course["title"],
-                "url": course["url"],
-                "source": platform,
-                "duration": course.get("duration", ""),
-                "description": course.get("description", ""),
-                "relevance_score": platform_best[platform]["score"]
-            })
+    for platform in PLATFORMS:
+        if top.get(platform):
+            (course, score), *others = top[platform]
+            recommendation = _recommendation(course, platform, score)
+            recommendation["alternatives"] = [
+                _recommendation(other, platform, other_score) for other, other_score in others
+            ]
+            recommendations.append(recommendation)
     
     return recommendations
 
-def rank_all_skills(skills, course_list):
-    """Rank courses for all skills with Google search links"""
+def _merge_courses(courses, extra):
+    """Append extra courses that aren't already present (by URL)"""
+    seen = {course.get("url") for course in courses}
+    merged = list(courses)
+    for course in extra:
+        if course.get("url") not in seen:
+            seen.add(course.get("url"))
+            merged.append(course)
+    return merged
+
+def _youtube_embeddings(candidate_lists):
+    """Embed every distinct YouTube course text among the candidates in one batch"""
+    texts = list(dict.fromkeys(
+        course_text(course)
+        for courses in candidate_lists for course in courses
+        if course.get("source", "").lower() == "youtube"
+    ))
+    if not texts:
+        return {}
+    return dict(zip(texts, get_embeddings(texts)))
+
+def rank_skill_courses(skill_clean, skill_courses, skill_embedding=None, youtube_embeddings=None):
+    """
+    Rank one skill's candidate courses: best per platform, fallback search links
+    for missing platforms, sorted by relevance. Returns None if there are no candidates.
+    youtube_embeddings maps course_text() to a precomputed embedding.
+    """
+    print(f"📊 Processing courses for: {skill_clean}")
+    metrics.observe("rank_candidates_per_skill", len(skill_courses), buckets=metrics.SIZE_BUCKETS)
+
+    # If no skill-specific courses found, this shouldn't happen with our new approach
+    if not skill_courses:
+        print(f"⚠️ No courses found for '{skill_clean}' - this shouldn't happen!")
+        return None
+
+    course_embeddings = None
+    if youtube_embeddings:
+        dim = len(next(iter(youtube_embeddings.values())))
+        course_embeddings = np.zeros((len(skill_courses), dim), dtype=np.float32)
+        for row, course in enumerate(skill_courses):
+            vector = youtube_embeddings.get(course_text(course))
+            if vector is not None:
+                course_embeddings[row] = vector
+    
+    # Get best courses per platform
+    best_courses = get_best_courses_per_platform(
+        skill_clean, skill_courses, skill_embedding, course_embeddings
+    )
+    
+    # Ensure we have at least one course per platform
+    platforms_found = {course["source"] for course in best_courses}
+    for platform in PLATFORMS:
+        if platform not in platforms_found:
+            best_courses.append(fallback_recommendation(skill_clean, platform))
+    
+    # Sort by relevance score
+    best_courses.sort(key=lambda x: x["relevance_score"], reverse=True)
+    
+    # Count real vs search results
+    real_courses = len([c for c in best_courses if c['relevance_score'] > 0.5])
+    search_links = len([c for c in best_courses if c['relevance_score'] <= 0.5])
+    print(f"✅ For '{skill_clean}': {real_courses} real courses, {search_links} search links")
+    return best_courses
+
+@metrics.timed("rank_all_skills_seconds")
+def rank_all_skills(skills, course_list, index=None, catalogue=None, catalogue_k=10):
+    """
+    Rank courses for all skills with Google search links.
+    Pass a prebuilt CourseIndex to reuse it across requests against a shared catalogue,
+    and a CourseCatalogue to add its top-k nearest courses to each skill's candidates.
+    """
     print(f"🔄 Ranking courses for {len(skills)} skills...")
     skill_course_map = {}
+
+    if index is None:
+        index = CourseIndex(course_list)
+
+    clean_skills = [clean_skill_name(skill) for skill in skills]
+    candidate_lists = [index.candidates(skill_clean, TOP_K_PER_PLATFORM) for skill_clean in clean_skills]
+    if catalogue is not None:
+        catalogue_courses = catalogue.courses_for_skills(clean_skills, catalogue_k)
+        candidate_lists = [
+            _merge_courses(candidates, catalogue_courses.get(skill_clean, []))
+            for skill_clean, candidates in zip(clean_skills, candidate_lists)
+        ]
+
+    # Embed all skills and all candidate YouTube courses up front, one batch each
+    try:
+        skill_embeddings = get_embeddings(clean_skills) if clean_skills else []
+        youtube_embeddings = _youtube_embeddings(candidate_lists)
+    except Exception as e:
+        print(f"⚠️ Could not precompute embeddings: {e}")
+        skill_embeddings, youtube_embeddings = [None] * len(clean_skills), {}
     
-    for skill in skills:
-        skill_clean = clean_skill_name(skill)
-        print(f"📊 Processing courses for: {skill_clean}")
-        
-        # Filter courses for this specific skill
-        skill_courses = []
-        skill_lower = skill_clean.lower()
-        
-        for course in course_list:
-            course_skill = course.get("skill", "").lower()
-            title = course.get("title", "").lower()
-            description = course.get("description", "").lower()
-            
-            # Check if course is relevant to this skill
-            if (course_skill == skill_lower or 
-                skill_lower in title or 
-                skill_lower in description or
-                any(word in title for word in skill_lower.split())):
-                skill_courses.append(course)
-        
-        # If no skill-specific courses found, this shouldn't happen with our new approach
-        if not skill_courses:
-            print(f"⚠️ No courses found for '{skill_clean}' - this shouldn't happen!")
-            continue
-        
-        # Get best courses per platform
-        best_courses = get_best_courses_per_platform(skill_clean, skill_courses)
-        
-        # Ensure we have at least one course per platform
-        platforms_found = {course["source"] for course in best_courses}
-        for platform in ["coursera", "udemy", "youtube"]:
-            if platform not in platforms_found:
-                # Create a fallback search link
-                from urllib.parse import quote_plus
-                
-                if platform == "coursera":
-                    search_query = f"site:coursera.org {skill_clean}"
-                    url = f"https://www.google.com/search?q={quote_plus(search_query)}"
-                elif platform == "udemy":
-                    search_query = f"site:udemy.com {skill_clean}"
-                    url = f"https://www.google.com/search?q={quote_plus(search_query)}"
-                else:  # youtube
-                    url = f"https://www.youtube.com/results?search_query={quote_plus(skill_clean + ' tutorial')}"
-                
-                best_courses.append({
-                    "title": f"Search {skill_clean} on {platform.title()}",
-                    "url": url,
-                    "source": platform,
-                    "duration": "Search Results",
-                    "description": f"Find {skill_clean} courses on {platform.title()}",
-                    "relevance_score": 0.3
-                })
-        
-        # Sort by relevance score
-        best_courses.sort(key=lambda x: x["relevance_score"], reverse=True)
-        
-        skill_course_map[skill_clean] = best_courses
-        
-        # Count real vs search results
-        real_courses = len([c for c in best_courses if c['relevance_score'] > 0.5])
-        search_links = len([c for c in best_courses if c['relevance_score'] <= 0.5])
-        print(f"✅ For '{skill_clean}': {real_courses} real courses, {search_links} search links")
+    for skill_clean, skill_courses, skill_embedding in zip(clean_skills, candidate_lists, skill_embeddings):
+        best_courses = rank_skill_courses(skill_clean, skill_courses, skill_embedding, youtube_embeddings)
+        if best_courses is not None:
+            skill_course_map[skill_clean] = best_courses
     
     return skill_course_map
 
+def iter_rank_all_skills(skill_courses):
+    """
+    Streaming variant of rank_all_skills.
+    Consumes (skill, courses) pairs, e.g. from iter_course_data_from_all_sources,
+    and yields (skill, ranked courses) as soon as each skill is ranked.
+    """
+    for skill, courses in skill_courses:
+        skill_clean = clean_skill_name(skill)
+        candidates = CourseIndex(courses).candidates(skill_clean, TOP_K_PER_PLATFORM)
+        try:
+            skill_embedding = get_embeddings([skill_clean])[0]
+            youtube_embeddings = _youtube_embeddings([candidates])
+        except Exception as e:
+            print(f"⚠️ Could not precompute embeddings: {e}")
+            skill_embedding, youtube_embeddings = None, {}
+        best_courses = rank_skill_courses(skill_clean, candidates, skill_embedding, youtube_embeddings)
+        yield skill, best_courses or []
+
 # === Enhanced scoring for different content types ===
 def get_content_type_score(course):
     """Get additional score based on content type"""
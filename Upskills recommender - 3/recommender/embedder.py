@@ -1,15 +1,95 @@
 # utils/embedder.py
 
-from sentence_transformers import SentenceTransformer
+import os
+import threading
+
+import numpy as np
+
+from recommender.embedding_cache import EmbeddingCache
+from utils import metrics
+from recommender.model_registry import get_model, get_model_id
+
+# Default on-disk cache location; set EMBEDDING_CACHE_DIR="" to keep it in memory only
+DEFAULT_CACHE_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "memory", "embedding_cache")
+)
+
+# Texts per forward pass; smaller batches lower peak memory, larger ones raise throughput
+DEFAULT_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+
+_caches = {}
+_cache_lock = threading.Lock()
+
+
+def course_text(course):
+    """Text used to represent a course for semantic matching"""
+    text = getattr(course, "text", None)  # cached on Course objects
+    if text is not None:
+        return text
+    return f"{course.get('title', '')} {course.get('description', '')}"
+
+
+def get_cache():
+    """
+    Returns the embedding cache for the configured model and backend, creating it on first use.
+    """
+    model_id = get_model_id()
+    cache = _caches.get(model_id)
+    if cache is None:
+        with _cache_lock:
+            cache = _caches.get(model_id)
+            if cache is None:
+                cache_dir = os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_CACHE_DIR)
+                cache = EmbeddingCache(
+                    model_id,
+                    cache_dir=cache_dir or None,
+                    memory_size=int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", 4096)),
+                    disk_capacity=int(os.getenv("EMBEDDING_CACHE_DISK_CAPACITY", 50_000)),
+                )
+                _caches[model_id] = cache
+    return cache
+
+
+def get_embeddings(texts, batch_size=None):
+    """
+    Returns a float32 matrix with one embedding row per input string.
+    Cached texts skip the model; the rest are encoded in one call, in forward
+    passes of batch_size texts (EMBEDDING_BATCH_SIZE by default).
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    cache = get_cache()
+    found = cache.get_many(texts)
+
+    missing = [i for i in range(len(texts)) if i not in found]
+    metrics.incr("embedding_calls_total")
+    metrics.incr("embedding_texts_total", len(texts))
+    metrics.incr("embedding_cache_lookups_total", len(found), result="hit")
+    metrics.incr("embedding_cache_lookups_total", len(missing), result="miss")
+    if missing:
+        # Encode each distinct missing text once
+        unique = list(dict.fromkeys(texts[i] for i in missing))
+        metrics.observe("embedding_batch_size", len(unique), buckets=metrics.SIZE_BUCKETS)
+        with metrics.timer("embedding_encode_seconds"):
+            encoded = get_model().encode(unique, batch_size=batch_size, convert_to_numpy=True)
+        encoded = np.asarray(encoded, dtype=np.float32)
+        cache.put_many(unique, encoded)
+        by_text = dict(zip(unique, encoded))
+        for i in missing:
+            found[i] = by_text[texts[i]]
+
+    return np.stack([found[i] for i in range(len(texts))])
 
-# Load model once and reuse
-model = SentenceTransformer('all-MiniLM-L6-v2')
 
 def get_embedding(text):
     """
     Returns the embedding tensor for a given input string.
     """
-    return model.encode(text, convert_to_tensor=True)
+    import torch
+    return torch.from_numpy(get_embeddings([text])[0])
 
 
 def get_similarity(text1, text2):
@@ -0,0 +1,286 @@
+# recommender/embedding_cache.py
+"""
+Content-addressed embedding cache.
+
+Entries are keyed by (model name, normalized text hash) and kept in two tiers:
+    1. an in-process LRU of recently used vectors
+    2. an on-disk float32 memmap with a small SQLite index, shared by every
+       process pointing at the same cache directory
+
+Both tiers are size bounded; the disk tier evicts least recently used rows.
+Reopening the disk tier with a smaller capacity drops the rows past it.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MEMORY_SIZE = 4096
+DEFAULT_DISK_CAPACITY = 50_000
+
+# Stay well below SQLite's bound-parameter limit
+_QUERY_CHUNK = 500
+
+# Rows being written are held under placeholder keys; a placeholder older than
+# the timeout was left by a failed or killed writer and its row can be reused
+_PENDING_PREFIX = "pending:"
+_PENDING_TIMEOUT = 60
+
+
+def normalize_text(text):
+    """Normalize text before hashing so trivial variants share an entry"""
+    text = unicodedata.normalize("NFKC", str(text))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(model_name, text):
+    """Stable key for a (model, text) pair"""
+    payload = f"{model_name}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _pending_key(row):
+    return f"{_PENDING_PREFIX}{row}"
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + disk memmap) cache of float32 embeddings"""
+
+    def __init__(self, model_name, cache_dir=None,
+                 memory_size=DEFAULT_MEMORY_SIZE, disk_capacity=DEFAULT_DISK_CAPACITY):
+        self.model_name = model_name
+        self.memory_size = memory_size
+        self.disk_capacity = disk_capacity
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._vectors = None
+        self._dim = None
+
+        if cache_dir:
+            safe_name = re.sub(r"[^\w.-]", "_", model_name)
+            self._dir = os.path.join(cache_dir, safe_name)
+            os.makedirs(self._dir, exist_ok=True)
+            self._open_index()
+
+    # --- disk tier -------------------------------------------------------
+
+    def _open_index(self):
+        self._db = sqlite3.connect(
+            os.path.join(self._dir, "index.db"), timeout=30, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, row INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+        self._db.commit()
+
+        self._ensure_vectors()
+
+    def _ensure_vectors(self):
+        # Another process may have created the vector file since we opened the index
+        if self._vectors is None:
+            row = self._db.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+            if row:
+                self._open_vectors(row[0])
+        return self._vectors is not None
+
+    def _open_vectors(self, dim):
+        path = os.path.join(self._dir, "vectors.f32")
+        # Create the file atomically: "w+" would truncate a file another process
+        # just created. "r+" grows it to the mapped size if needed.
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_RDWR))
+        except FileExistsError:
+            pass
+        self._drop_rows_past_capacity()
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r+",
+                                  shape=(self.disk_capacity, dim))
+        self._dim = dim
+
+    def _drop_rows_past_capacity(self):
+        """Forget entries stored past disk_capacity (the cache was built with a larger one)"""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            dropped = self._db.execute(
+                "DELETE FROM entries WHERE row >= ?", (self.disk_capacity,)
+            ).rowcount
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+        if dropped > 0:
+            self.stats["evictions"] += dropped
+            print(f"♻️ Embedding cache capacity is now {self.disk_capacity}: dropped {dropped} entries")
+
+    def _select_rows(self, keys):
+        rows = []
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(self._db.execute(
+                f"SELECT key, row FROM entries WHERE key IN ({placeholders})", chunk
+            ).fetchall())
+        return rows
+
+    def _disk_get(self, keys):
+        if self._db is None or not keys or not self._ensure_vectors():
+            return {}
+
+        found = {}
+        rows = self._select_rows(keys)
+        # Rows past our mapping belong to a process configured with a larger capacity
+        rows = [(key, row) for key, row in rows if row < len(self._vectors)]
+        for key, row in rows:
+            found[key] = np.array(self._vectors[row])
+
+        if rows:
+            now = time.time()
+            self._db.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key, _ in rows]
+            )
+            self._db.commit()
+        return found
+
+    def _disk_put(self, items):
+        if self._db is None or not items:
+            return
+
+        if not self._ensure_vectors():
+            dim = len(next(iter(items.values())))
+            self._db.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('dim', ?)", (dim,))
+            self._db.commit()
+            self._ensure_vectors()
+
+        now = time.time()
+        reserved = self._reserve_rows(list(items), now)
+        if not reserved:
+            return
+
+        for key, row in reserved:
+            self._vectors[row] = items[key]
+        self._vectors.flush()
+        # Publish the keys only now that their vectors are on disk. A key another
+        # process stored meanwhile keeps its entry; our placeholder ages out.
+        try:
+            self._db.executemany(
+                "UPDATE OR IGNORE entries SET key = ?, last_used = ? WHERE key = ?",
+                [(key, now, _pending_key(row)) for key, row in reserved],
+            )
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+
+    def _reserve_rows(self, keys, now):
+        """
+        Claim rows for the keys not stored yet, as [(key, row)], under placeholder
+        entries. Evicted entries are turned into placeholders in the same committed
+        step, so no key points at a row while it is being overwritten.
+        """
+        # IMMEDIATE serializes row allocation between processes sharing the cache
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            existing = {key for key, _ in self._select_rows(keys)}
+            new_keys = [key for key in keys if key not in existing][:self.disk_capacity]
+
+            used = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            rows = list(range(used, min(used + len(new_keys), self.disk_capacity)))
+            self._db.executemany(
+                "INSERT INTO entries (key, row, last_used) VALUES (?, ?, ?)",
+                [(_pending_key(row), row, now) for row in rows],
+            )
+
+            shortfall = len(new_keys) - len(rows)
+            if shortfall > 0:
+                # Placeholders of a write still in progress are skipped; abandoned ones are reused
+                victims = self._db.execute(
+                    "SELECT key, row FROM entries WHERE row < ? "
+                    "AND (key NOT LIKE ? OR last_used < ?) ORDER BY last_used LIMIT ?",
+                    (self.disk_capacity, _PENDING_PREFIX + "%", now - _PENDING_TIMEOUT, shortfall),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE entries SET key = ?, last_used = ? WHERE key = ?",
+                    [(_pending_key(row), now, key) for key, row in victims],
+                )
+                rows.extend(row for _, row in victims)
+                self.stats["evictions"] += len(victims)
+            self._db.commit()
+        except Exception:
+            self._db.rollback()
+            raise
+        return list(zip(new_keys, rows))
+
+    # --- memory tier -----------------------------------------------------
+
+    def _memory_put(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # --- public API ------------------------------------------------------
+
+    def get_many(self, texts):
+        """Return {index: vector} for the texts already cached"""
+        keys = [cache_key(self.model_name, t) for t in texts]
+        found = {}
+
+        with self._lock:
+            tiers = {}
+            missing = []
+            for key in dict.fromkeys(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    tiers[key] = "memory_hits"
+                else:
+                    missing.append(key)
+
+            for key, vector in self._disk_get(missing).items():
+                self._memory_put(key, vector)
+                found[key] = vector
+                tiers[key] = "disk_hits"
+
+            for key in keys:
+                self.stats[tiers.get(key, "misses")] += 1
+
+        return {i: found[key] for i, key in enumerate(keys) if key in found}
+
+    def put_many(self, texts, vectors):
+        """Store vectors for the given texts in both tiers"""
+        items = {}
+        for text, vector in zip(texts, vectors):
+            items[cache_key(self.model_name, text)] = np.asarray(vector, dtype=np.float32)
+
+        with self._lock:
+            for key, vector in items.items():
+                self._memory_put(key, vector)
+            self._disk_put(items)
+
+    def get_stats(self):
+        """Hit/miss counters plus current tier sizes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear_memory(self):
+        """Drop the in-process tier (the disk tier is kept)"""
+        with self._lock:
+            self._memory.clear()
@@ -0,0 +1,110 @@
+# recommender/fallback_links.py
+"""
+Synthetic course entries that depend only on the skill name: the Google
+site-search links per platform, the fallback search link the ranker adds
+for a platform with no results, and the planner's "Coming soon" placeholder.
+
+Each is built once per (skill, platform) and memoized. Search-link Course
+records are shared between callers and must be treated as read-only;
+dict entries are returned as copies, since they end up in plans and
+API responses.
+
+Configuration:
+    FALLBACK_LINK_CACHE_SIZE  (skill, platform) entries kept per template (default 4096)
+"""
+import os
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+from recommender.course_model import Course
+
+CACHE_SIZE = int(os.getenv("FALLBACK_LINK_CACHE_SIZE", 4096))
+
+PLATFORM_DOMAINS = {
+    "coursera": "coursera.org",
+    "udemy": "udemy.com",
+    "edx": "edx.org",
+    "khan-academy": "khanacademy.org"
+}
+
+# Relevance given to the ranker's fallback search links
+FALLBACK_SCORE = 0.3
+YOUTUBE_RESULTS_URL = "https://www.youtube.com/results"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _search_links(skill, platform):
+    domain = PLATFORM_DOMAINS.get(platform)
+    if domain is None:
+        return ()
+
+    search_variations = [
+        f"{skill} course",
+        f"{skill} tutorial",
+        f"learn {skill}",
+        f"{skill} certification"
+    ]
+    return tuple(
+        Course(
+            title=f"{skill} - {platform.title()} Search {i}",
+            description=f"Search for '{variation}' on {platform.title()}",
+            url=f"https://www.google.com/search?q={quote_plus(f'site:{domain} {variation}')}",
+            source=platform,
+            duration="Search Results",
+            skill=skill,
+            is_search_link=True
+        )
+        for i, variation in enumerate(search_variations, 1)
+    )
+
+
+def platform_search_links(skill, platform):
+    """Google site-search Course records for a skill on one platform (empty for unknown platforms)"""
+    return list(_search_links(skill, platform))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _fallback_recommendation(skill, platform):
+    if platform == "youtube":
+        url = f"{YOUTUBE_RESULTS_URL}?search_query={quote_plus(skill + ' tutorial')}"
+    else:
+        domain = PLATFORM_DOMAINS.get(platform, f"{platform}.com")
+        url = f"https://www.google.com/search?q={quote_plus(f'site:{domain} {skill}')}"
+
+    return {
+        "title": f"Search {skill} on {platform.title()}",
+        "url": url,
+        "source": platform,
+        "duration": "Search Results",
+        "description": f"Find {skill} courses on {platform.title()}",
+        "relevance_score": FALLBACK_SCORE
+    }
+
+
+def fallback_recommendation(skill, platform):
+    """Ranked search-link entry for a platform that had no courses for the skill"""
+    return dict(_fallback_recommendation(skill, platform))
+
+
+def has_youtube_video(ranked):
+    """True if a skill's ranked courses include a real YouTube video, not just the search fallback"""
+    return any(
+        course.get("source") == "youtube" and not course.get("url", "").startswith(YOUTUBE_RESULTS_URL)
+        for course in ranked
+    )
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _placeholder_resource(skill, platform):
+    return {
+        "title": f"{skill} Course ({platform.title()})",
+        "url": "#",
+        "source": platform,
+        "duration": "Coming soon",
+        "relevance_score": 0.0
+    }
+
+
+def placeholder_resource(skill, platform):
+    """Plan resource shown when a platform has no usable link for the skill"""
+    return dict(_placeholder_resource(skill, platform))
@@ -0,0 +1,164 @@
+# recommender/model_registry.py
+"""
+Process-wide registry for the sentence embedding model.
+
+The model is loaded lazily on first use and shared by every caller, so
+importing recommender modules is cheap and a worker holds a single copy.
+
+Configuration (environment variables or configure()):
+    EMBEDDING_MODEL        model name (default: all-MiniLM-L6-v2)
+    EMBEDDING_DEVICE       "cpu", "cuda", ... (default: auto)
+    EMBEDDING_NUM_THREADS  CPU intra-op threads (torch, or the ONNX Runtime session)
+    EMBEDDING_BACKEND      "torch" (default fp32), "onnx" or "int8" (dynamically quantized torch)
+    EMBEDDING_ONNX_FILE    ONNX file inside the model repo, e.g. onnx/model_qint8_avx512_vnni.onnx
+                           for a pre-quantized int8 ONNX model (default: onnx/model.onnx)
+
+warm_up() loads the model on a background thread so that entry points can
+start serving (or prompting) while it loads.
+"""
+import os
+import threading
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+SUPPORTED_BACKENDS = ("torch", "onnx", "int8")
+
+_lock = threading.Lock()
+_models = {}
+_overrides = {}
+
+
+def configure(model_name=None, device=None, num_threads=None, backend=None, onnx_file=None):
+    """Override the environment configuration for models loaded afterwards"""
+    values = {
+        "model_name": model_name,
+        "device": device,
+        "num_threads": num_threads,
+        "backend": backend,
+        "onnx_file": onnx_file,
+    }
+    with _lock:
+        _overrides.update({k: v for k, v in values.items() if v is not None})
+
+
+def get_model_config():
+    """Resolve the active model configuration"""
+    num_threads = os.getenv("EMBEDDING_NUM_THREADS")
+    config = {
+        "model_name": os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL_NAME),
+        "device": os.getenv("EMBEDDING_DEVICE") or None,
+        "num_threads": int(num_threads) if num_threads else None,
+        "backend": os.getenv("EMBEDDING_BACKEND", "torch").lower(),
+        "onnx_file": os.getenv("EMBEDDING_ONNX_FILE") or None,
+    }
+    config.update(_overrides)
+
+    if config["backend"] not in SUPPORTED_BACKENDS:
+        raise ValueError(
+            f"Unsupported embedding backend '{config['backend']}', "
+            f"expected one of {SUPPORTED_BACKENDS}"
+        )
+    return config
+
+
+def get_model_name():
+    """Name of the configured embedding model"""
+    return get_model_config()["model_name"]
+
+
+def get_model_id():
+    """
+    Model name plus backend, for anything that stores embeddings: int8 and ONNX
+    vectors differ slightly from fp32, so they must not share cached vectors.
+    """
+    config = get_model_config()
+    if config["backend"] == "torch":
+        return config["model_name"]
+    suffix = config["backend"]
+    if config["backend"] == "onnx" and config["onnx_file"]:
+        suffix += ":" + config["onnx_file"]
+    return f"{config['model_name']}@{suffix}"
+
+
+def _load_model(config):
+    from sentence_transformers import SentenceTransformer
+
+    if config["num_threads"]:
+        import torch
+        torch.set_num_threads(config["num_threads"])
+
+    backend = config["backend"]
+    if backend == "onnx":
+        model_kwargs = {}
+        if config["onnx_file"]:
+            model_kwargs["file_name"] = config["onnx_file"]
+        if config["num_threads"]:
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = config["num_threads"]
+            model_kwargs["session_options"] = options
+        return SentenceTransformer(
+            config["model_name"], device=config["device"], backend="onnx", model_kwargs=model_kwargs
+        )
+
+    if backend == "int8":
+        # Dynamic quantization only runs on CPU
+        import torch
+        model = SentenceTransformer(config["model_name"], device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return SentenceTransformer(config["model_name"], device=config["device"])
+
+
+def get_model():
+    """
+    Return the shared embedding model, loading it on first use.
+    Safe to call from multiple threads; the model is only loaded once.
+    """
+    config = get_model_config()
+    key = tuple(sorted(config.items()))
+
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                print(f"🔄 Loading embedding model '{config['model_name']}' ({config['backend']})...")
+                model = _load_model(config)
+                _models[key] = model
+    return model
+
+
+def set_model(model):
+    """
+    Install an already-built model (e.g. a stub in benchmarks) for the current
+    configuration, replacing whatever get_model() would have loaded.
+    """
+    key = tuple(sorted(get_model_config().items()))
+    with _lock:
+        _models[key] = model
+
+
+def is_loaded():
+    """True if the configured model is already in memory"""
+    return tuple(sorted(get_model_config().items())) in _models
+
+
+def warm_up(background=True):
+    """
+    Load the configured model and run one tiny encode so the first real call
+    doesn't pay for it. With background=True this runs on a daemon thread,
+    which is returned; get_model() callers simply wait for the load in progress.
+    """
+    def run():
+        try:
+            get_model().encode(["warm up"])
+            print("✅ Embedding model warmed up")
+        except Exception as e:
+            print(f"⚠️ Model warm-up failed: {e}")
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,228 @@
+# recommender/parallel_ranker.py
+"""
+Process-pool ranking for large course lists.
+
+The course list is split into contiguous shards, one per worker process.
+The parent embeds the YouTube course texts once (through the embedding
+cache) into a float32 memmap; workers open it read-only, so they need no
+model and no copy of the vectors. Each worker builds a CourseIndex over its
+shard, scores its candidates for every skill and returns its per-platform
+top candidates. The parent merges the shards and runs the usual final
+ranking (MMR, fallback links) on the merged candidates, so the result matches
+rank_all_skills.
+
+    with ParallelRanker(max_workers=8) as ranker:
+        ranked = ranker.rank_all_skills(skills, course_list)
+
+pipeline.rank_missing uses the shared get_parallel_ranker() instance.
+
+Configuration:
+    RANK_PROCESSES            worker processes (default: CPU count)
+    RANK_PARALLEL_MIN_COURSES smaller lists are ranked in-process (default 5000)
+    RANK_SHARED_DIR           where the embedding memmap is written (default /dev/shm if present)
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from recommender.course_index import CourseIndex
+from recommender.course_model import SOURCE_CODES, Course
+from recommender.course_ranker import (
+    MMR_POOL_FACTOR, TOP_K_PER_PLATFORM, _merge_courses, _youtube_embeddings, clean_skill_name,
+    get_top_courses_per_platform, rank_all_skills, rank_skill_courses,
+)
+from recommender.embedder import course_text, get_embeddings
+from utils import metrics
+
+EMBED_CHUNK = 4096  # texts embedded per call while filling the memmap
+
+_ranker = None
+_lock = threading.Lock()
+
+
+def _top_rows(index, ids, offset, skill, skill_embedding, vectors, pool_size):
+    """{platform: [global row, ...]} of the top pool_size candidates per platform"""
+    if not ids:
+        return {}
+    courses = [index.courses[i] for i in ids]
+    rows = [offset + i for i in ids]
+    embeddings = np.asarray(vectors[rows]) if vectors is not None else None
+    # mmr_lambda=1.0: plain relevance order; MMR runs once, on the merged pool
+    top = get_top_courses_per_platform(skill, courses, pool_size, skill_embedding, embeddings, mmr_lambda=1.0)
+    row_of = {id(course): row for course, row in zip(courses, rows)}
+    return {platform: [row_of[id(course)] for course, _ in picks] for platform, picks in top.items()}
+
+
+def _rank_shard(shard, offset, skills, skill_embeddings, vectors_path, shape, pool_size):
+    """
+    Worker: candidate courses of one shard for every skill, as {skill: (token
+    matches per platform, top rows per platform, top rows per platform with the
+    substring fallback)}. Whether a platform needs the fallback depends on its
+    token matches in every shard, so the parent decides which rows to use.
+    """
+    vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=shape) if shape[0] else None
+    index = CourseIndex(shard)
+    result = {}
+    for skill, skill_embedding in zip(skills, skill_embeddings):
+        ids = index.candidate_ids(skill)
+        counts = index.platform_counts(ids)
+        top = _top_rows(index, ids, offset, skill, skill_embedding, vectors, pool_size)
+
+        fallback_ids = index.candidate_ids(skill, TOP_K_PER_PLATFORM)
+        if len(fallback_ids) > len(ids):
+            fallback = _top_rows(index, fallback_ids, offset, skill, skill_embedding, vectors, pool_size)
+        else:
+            fallback = top
+        if top or fallback:
+            result[skill] = (counts, top, fallback)
+    return result
+
+
+class ParallelRanker:
+    """Shards rank_all_skills across a process pool"""
+
+    def __init__(self, max_workers=None, min_courses=None, shared_dir=None):
+        self.max_workers = max_workers or int(os.getenv("RANK_PROCESSES", os.cpu_count() or 1))
+        self.min_courses = (
+            int(os.getenv("RANK_PARALLEL_MIN_COURSES", 5000)) if min_courses is None else min_courses
+        )
+        default_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        self.shared_dir = shared_dir or os.getenv("RANK_SHARED_DIR") or default_dir
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: workers must not inherit torch/tokenizer threads from the parent
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_vectors(self, courses, path):
+        """Embed YouTube course texts into a memmap aligned with courses (zeros elsewhere)"""
+        rows = [i for i, course in enumerate(courses) if (course.get("source") or "").lower() == "youtube"]
+        if not rows:
+            return (0, 0)
+
+        vectors = None
+        for start in range(0, len(rows), EMBED_CHUNK):
+            chunk = rows[start:start + EMBED_CHUNK]
+            embeddings = get_embeddings([course_text(courses[i]) for i in chunk])
+            if vectors is None:
+                vectors = np.memmap(path, dtype=np.float32, mode="w+", shape=(len(courses), embeddings.shape[1]))
+            vectors[chunk] = embeddings
+        vectors.flush()
+        return vectors.shape
+
+    def rank_all_skills(self, skills, course_list, catalogue=None, catalogue_k=10):
+        """Same inputs and result as course_ranker.rank_all_skills"""
+        if len(course_list) < self.min_courses or self.max_workers < 2 or not skills:
+            return rank_all_skills(skills, course_list, catalogue=catalogue, catalogue_k=catalogue_k)
+        return self._rank_parallel(skills, course_list, catalogue, catalogue_k)
+
+    @metrics.timed("rank_all_skills_parallel_seconds")
+    def _rank_parallel(self, skills, course_list, catalogue, catalogue_k):
+        courses = [Course.from_dict(course) for course in course_list]
+        clean_skills = [clean_skill_name(skill) for skill in skills]
+        print(f"🔄 Ranking {len(courses)} courses for {len(skills)} skills on {self.max_workers} processes...")
+
+        workdir = tempfile.mkdtemp(prefix="rank-", dir=self.shared_dir)
+        try:
+            path = os.path.join(workdir, "vectors.f32")
+            try:
+                skill_embeddings = list(get_embeddings(clean_skills))
+                shape = self._write_vectors(courses, path)
+            except Exception as e:
+                # Workers have no model of their own; let the in-process ranker deal with it
+                print(f"⚠️ Could not precompute embeddings, ranking in-process: {e}")
+                return rank_all_skills(skills, course_list, catalogue=catalogue, catalogue_k=catalogue_k)
+
+            pool_size = TOP_K_PER_PLATFORM * MMR_POOL_FACTOR
+            shard_size = -(-len(courses) // self.max_workers)
+            futures = [
+                self._get_executor().submit(
+                    _rank_shard, courses[start:start + shard_size], start, clean_skills,
+                    skill_embeddings, path, shape, pool_size,
+                )
+                for start in range(0, len(courses), shard_size)
+            ]
+
+            # Merge the shards' candidate rows per skill, in course-list order; like
+            # CourseIndex.candidate_ids, a platform with fewer than TOP_K_PER_PLATFORM
+            # token matches overall takes the substring fallback rows
+            counts = {skill: Counter() for skill in clean_skills}
+            top_rows = {skill: defaultdict(list) for skill in clean_skills}
+            fallback_rows = {skill: defaultdict(list) for skill in clean_skills}
+            for future in futures:
+                for skill, (shard_counts, top, fallback) in future.result().items():
+                    counts[skill].update(shard_counts)
+                    for platform, rows in top.items():
+                        top_rows[skill][platform].extend(rows)
+                    for platform, rows in fallback.items():
+                        fallback_rows[skill][platform].extend(rows)
+
+            candidate_rows = {}
+            for skill in clean_skills:
+                candidate_rows[skill] = [
+                    row
+                    for platform in set(top_rows[skill]) | set(fallback_rows[skill])
+                    for row in (fallback_rows[skill][platform] if counts[skill][platform] < TOP_K_PER_PLATFORM
+                                else top_rows[skill][platform])
+                ]
+
+            vectors = np.memmap(path, dtype=np.float32, mode="r", shape=shape) if shape[0] else None
+            candidate_lists = []
+            youtube_embeddings = {}
+            for skill in clean_skills:
+                rows = sorted(set(candidate_rows[skill]))
+                candidate_lists.append([courses[row] for row in rows])
+                if vectors is not None:
+                    for row in rows:
+                        if courses[row].source_code == SOURCE_CODES["youtube"]:
+                            youtube_embeddings[courses[row].text] = np.array(vectors[row])
+            del vectors
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        if catalogue is not None:
+            catalogue_courses = catalogue.courses_for_skills(clean_skills, catalogue_k)
+            extra = [catalogue_courses.get(skill, []) for skill in clean_skills]
+            candidate_lists = [
+                _merge_courses(candidates, courses_for_skill)
+                for candidates, courses_for_skill in zip(candidate_lists, extra)
+            ]
+            youtube_embeddings.update(_youtube_embeddings(extra))
+
+        skill_course_map = {}
+        for skill_clean, skill_courses, skill_embedding in zip(clean_skills, candidate_lists, skill_embeddings):
+            best_courses = rank_skill_courses(skill_clean, skill_courses, skill_embedding, youtube_embeddings)
+            if best_courses is not None:
+                skill_course_map[skill_clean] = best_courses
+        return skill_course_map
+
+
+def get_parallel_ranker():
+    """Shared ParallelRanker; its worker processes start on first parallel use"""
+    global _ranker
+    if _ranker is None:
+        with _lock:
+            if _ranker is None:
+                _ranker = ParallelRanker()
+    return _ranker
@@ -0,0 +1,132 @@
+# recommender/ranking_cache.py
+"""
+Per-skill cache of final ranked platform results, shared across goals.
+
+"Data Scientist" and "ML Engineer" both need Python and SQL, so rankings are
+stored per clean_skill_name() in SQLite (shared by every process) and reused
+until they expire. Entries are versioned by embedding model, catalogue and
+ranking settings; a version change simply misses and re-ranks.
+
+Configuration:
+    RANKING_CACHE_PATH         SQLite file ("" disables the cache)
+    RANKING_CACHE_TTL          seconds a ranking is reused (default 24h)
+    RANKING_CACHE_MAX_ENTRIES  LRU bound (default 20000)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_RANKING_CACHE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "memory", "rankings_cache.db")
+)
+
+_cache = None
+_lock = threading.Lock()
+
+
+class RankingCache:
+    """SQLite-backed (skill, version) -> ranked courses with TTL and LRU size bound"""
+
+    def __init__(self, path, ttl=24 * 3600, max_entries=20000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rankings ("
+            "skill TEXT NOT NULL, version TEXT NOT NULL, value TEXT NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (skill, version))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS rankings_last_used ON rankings(last_used)")
+        self._db.commit()
+
+    def get_many(self, skills, version):
+        """Fresh cached rankings for the given clean skill names, as {skill: ranked}"""
+        skills = list(dict.fromkeys(skills))
+        if not skills:
+            return {}
+        now = time.time()
+        with self._lock:
+            placeholders = ",".join("?" * len(skills))
+            rows = self._db.execute(
+                f"SELECT skill, value FROM rankings WHERE version = ? AND created >= ? "
+                f"AND skill IN ({placeholders})",
+                (version, now - self.ttl, *skills),
+            ).fetchall()
+            if rows:
+                self._db.executemany(
+                    "UPDATE rankings SET last_used = ? WHERE skill = ? AND version = ?",
+                    [(now, skill, version) for skill, _ in rows],
+                )
+                self._db.commit()
+
+        found = {skill: json.loads(value) for skill, value in rows}
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(skills) - len(found)
+        return found
+
+    def set_many(self, rankings, version):
+        """Store {skill: ranked} and evict least recently used entries beyond max_entries"""
+        if not rankings:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO rankings (skill, version, value, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(skill, version, json.dumps(ranked), now, now) for skill, ranked in rankings.items()],
+            )
+            self._db.execute("DELETE FROM rankings WHERE created < ?", (now - self.ttl,))
+            self._db.execute(
+                "DELETE FROM rankings WHERE rowid IN ("
+                "SELECT rowid FROM rankings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM rankings")
+            self._db.commit()
+
+
+def get_ranking_cache():
+    """Shared ranking cache, or None when disabled"""
+    global _cache
+    path = os.getenv("RANKING_CACHE_PATH", DEFAULT_RANKING_CACHE_PATH)
+    if not path:
+        return None
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = RankingCache(
+                    path,
+                    ttl=float(os.getenv("RANKING_CACHE_TTL", 24 * 3600)),
+                    max_entries=int(os.getenv("RANKING_CACHE_MAX_ENTRIES", 20000)),
+                )
+    return _cache
+
+
+def ranking_version(catalogue=None):
+    """
+    Everything a cached ranking depends on besides the skill: embedding model,
+    catalogue contents, live fetching and the per-platform top-k.
+    """
+    from recommender.catalogue import get_default_catalogue
+    from recommender.course_ranker import MMR_LAMBDA, TOP_K_PER_PLATFORM
+    from recommender.model_registry import get_model_id
+    from utils.fetch_courses import LIVE_COURSE_FETCH
+
+    if catalogue is None:
+        catalogue = get_default_catalogue()
+    return "|".join([
+        get_model_id(),
+        catalogue.version if catalogue is not None else "no-catalogue",
+        "live" if LIVE_COURSE_FETCH else "offline",
+        f"k{TOP_K_PER_PLATFORM}:mmr{MMR_LAMBDA}",
+    ])
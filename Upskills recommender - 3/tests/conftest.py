@@ -0,0 +1,23 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Keep the shared on-disk caches out of memory/; tests that need a cache build their own under tmp_path
+for name in ("EMBEDDING_CACHE_DIR", "RANKING_CACHE_PATH", "SKILL_CACHE_PATH", "YOUTUBE_CACHE_PATH"):
+    os.environ[name] = ""
+
+from benchmarks.fake_models import FakeEmbeddingModel
+
+
+@pytest.fixture
+def embedding_model():
+    """Deterministic embedding model installed for the current configuration"""
+    from recommender import model_registry
+
+    model = FakeEmbeddingModel()
+    model_registry.set_model(model)
+    return model
@@ -0,0 +1,30 @@
+# tests/test_batch_plan.py
+import json
+import sys
+
+import batch_plan
+import pipeline
+from benchmarks.bench_pipeline import synthetic_courses
+from recommender import parallel_ranker
+
+
+def test_single_process_never_starts_workers(tmp_path, monkeypatch, embedding_model):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("a process pool was started")
+
+    monkeypatch.setenv("RANK_PARALLEL_MIN_COURSES", "0")
+    monkeypatch.setattr(parallel_ranker, "ProcessPoolExecutor", no_pool)
+    monkeypatch.setattr(pipeline, "get_parallel_ranker", no_pool)
+    monkeypatch.setattr(batch_plan, "load_course_data_from_all_sources",
+                        lambda skills: synthetic_courses(skills, 6000))
+
+    goals = tmp_path / "goals.jsonl"
+    goals.write_text(json.dumps({"id": "g1", "goal": "Data analyst", "skills": ["Python", "SQL"]}) + "\n")
+    output = tmp_path / "plans.jsonl"
+    monkeypatch.setattr(sys, "argv", ["batch_plan.py", str(goals), "-o", str(output), "--processes", "1"])
+
+    batch_plan.main()
+
+    plan = json.loads(output.read_text())
+    assert plan["id"] == "g1"
+    assert plan["skills"] == ["Python", "Sql"]
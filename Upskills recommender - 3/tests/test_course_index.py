@@ -0,0 +1,72 @@
+# tests/test_course_index.py
+from collections import Counter
+
+import pytest
+
+from recommender.course_index import CourseIndex
+from recommender.course_ranker import TOP_K_PER_PLATFORM, clean_skill_name, rank_all_skills
+from recommender.parallel_ranker import ParallelRanker
+
+TITLES = [
+    "MySQL Bootcamp", "PostgreSQL for Beginners", "SQL Basics", "NoSQL Databases",
+    "Learn C++ Programming", "C Programming Essentials", "Objective-C for iOS", "C# Fundamentals",
+    "Python for Data Science", "Data Science with R", "JavaScript Crash Course", "TypeScript Deep Dive",
+]
+PLATFORMS = ["coursera", "udemy", "youtube"]
+SKILLS = ["SQL", "C++", "Python", "Data Science", "Script", "Java"]
+
+
+def make_courses():
+    courses = []
+    for platform in PLATFORMS:
+        for i, title in enumerate(TITLES):
+            courses.append({
+                "title": f"{title} ({platform})",
+                "description": f"A {platform} course, part {i}",
+                "url": f"https://{platform}.example/{i}",
+                "source": platform,
+                "skill": "",
+            })
+    return courses
+
+
+def baseline_candidates(skill, courses):
+    """The linear filter rank_all_skills used before the index"""
+    skill_lower = clean_skill_name(skill).lower()
+    return [
+        course for course in courses
+        if (course.get("skill", "").lower() == skill_lower
+            or skill_lower in course["title"].lower()
+            or skill_lower in course["description"].lower()
+            or any(word in course["title"].lower() for word in skill_lower.split()))
+    ]
+
+
+def per_platform(courses):
+    return Counter(course["source"] for course in courses)
+
+
+def test_embedded_skill_names_are_found():
+    index = CourseIndex(make_courses())
+    titles = [course["title"] for course in index.candidates("Sql", TOP_K_PER_PLATFORM)]
+    assert "MySQL Bootcamp (udemy)" in titles
+    assert "MySQL Bootcamp (udemy)" not in [course["title"] for course in index.candidates("Sql")]
+
+
+@pytest.mark.parametrize("skill", SKILLS)
+def test_recall_matches_the_baseline_filter_per_platform(skill):
+    courses = make_courses()
+    index = CourseIndex(courses)
+
+    found = per_platform(index.candidates(clean_skill_name(skill), TOP_K_PER_PLATFORM))
+    expected = per_platform(baseline_candidates(skill, courses))
+
+    for platform in PLATFORMS:
+        assert found[platform] >= min(TOP_K_PER_PLATFORM, expected[platform]), platform
+
+
+def test_parallel_ranker_applies_the_same_fallback(embedding_model):
+    courses = make_courses()
+    expected = rank_all_skills(SKILLS, courses)
+    with ParallelRanker(max_workers=2, min_courses=0) as ranker:
+        assert ranker.rank_all_skills(SKILLS, courses) == expected
@@ -0,0 +1,16 @@
+# tests/test_course_ranker.py
+from recommender import course_ranker
+from recommender.fallback_links import platform_search_links
+
+
+def test_search_link_scores_are_cached_per_normalized_skill():
+    links = platform_search_links("Python", "udemy")
+    course_ranker._search_link_score.cache_clear()
+
+    scores = course_ranker.score_courses("Python", links)
+    assert course_ranker.score_courses("python", links).tolist() == scores.tolist()
+    assert course_ranker.score_courses(" PYTHON ", links).tolist() == scores.tolist()
+
+    info = course_ranker._search_link_score.cache_info()
+    assert info.misses == len(links)
+    assert info.hits == 2 * len(links)
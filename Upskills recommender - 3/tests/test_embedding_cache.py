@@ -0,0 +1,98 @@
+# tests/test_embedding_cache.py
+import sqlite3
+
+import numpy as np
+import pytest
+
+from benchmarks.fake_models import FakeEmbeddingModel
+from recommender.embedding_cache import EmbeddingCache
+
+MODEL = FakeEmbeddingModel(dim=16)
+
+
+def texts(*names):
+    return [f"{name} complete course" for name in names]
+
+
+def put(cache, *names):
+    cache.put_many(texts(*names), MODEL.encode(texts(*names)))
+
+
+def disk_vectors(cache_dir, capacity, *names):
+    """Vectors a fresh process would read for the texts (misses are absent)"""
+    cache = EmbeddingCache("fake", cache_dir=cache_dir, memory_size=0, disk_capacity=capacity)
+    found = cache.get_many(texts(*names))
+    return {name: found[i] for i, name in enumerate(names) if i in found}
+
+
+def assert_correct(found):
+    for name, vector in found.items():
+        np.testing.assert_array_equal(vector, MODEL.encode(texts(name))[0])
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache("fake", cache_dir=str(tmp_path), memory_size=0, disk_capacity=4)
+    put(cache, "a", "b", "c", "d")
+    cache.get_many(texts("a", "c"))
+
+    put(cache, "e", "f")
+
+    found = disk_vectors(str(tmp_path), 4, "a", "b", "c", "d", "e", "f")
+    assert sorted(found) == ["a", "c", "e", "f"]
+    assert_correct(found)
+    assert cache.get_stats()["evictions"] == 2
+    assert cache.get_stats()["disk_entries"] == 4
+
+
+def test_reopening_with_a_smaller_capacity(tmp_path):
+    cache = EmbeddingCache("fake", cache_dir=str(tmp_path), memory_size=0, disk_capacity=6)
+    put(cache, "a", "b", "c", "d", "e", "f")
+
+    smaller = EmbeddingCache("fake", cache_dir=str(tmp_path), memory_size=0, disk_capacity=3)
+    assert smaller.stats["evictions"] == 3
+    found = smaller.get_many(texts("a", "b", "c", "d", "e", "f"))
+    assert sorted(found) == [0, 1, 2]
+
+    # New entries reuse rows inside the smaller mapping without clobbering live ones
+    put(smaller, "g", "h")
+    found = disk_vectors(str(tmp_path), 3, "a", "b", "c", "g", "h")
+    assert len(found) == 3
+    assert {"g", "h"} <= set(found)
+    assert_correct(found)
+
+
+class FailingPublish:
+    """SQLite connection whose final key-publishing step fails"""
+
+    def __init__(self, db):
+        self._db = db
+
+    def executemany(self, sql, params):
+        if sql.startswith("UPDATE OR IGNORE"):
+            raise sqlite3.OperationalError("disk I/O error")
+        return self._db.executemany(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+
+def test_failed_write_never_maps_a_key_to_another_vector(tmp_path):
+    cache = EmbeddingCache("fake", cache_dir=str(tmp_path), memory_size=0, disk_capacity=2)
+    put(cache, "a", "b")
+    cache.get_many(texts("b"))
+
+    db = cache._db
+    cache._db = FailingPublish(db)
+    with pytest.raises(sqlite3.OperationalError):
+        put(cache, "c")
+    cache._db = db
+
+    # "a" was evicted for "c": its row now holds c's vector, so "a" must be a miss
+    found = disk_vectors(str(tmp_path), 2, "a", "b", "c")
+    assert sorted(found) == ["b"]
+    assert_correct(found)
+
+    put(cache, "c")
+    found = disk_vectors(str(tmp_path), 2, "a", "b", "c")
+    assert sorted(found) == ["c"]
+    assert_correct(found)
@@ -0,0 +1,151 @@
+# tests/test_fetch_resilience.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fake_youtube import FakeYouTubeServer
+from utils import fetch_courses
+from utils.circuit_breaker import CircuitBreaker
+from utils.rate_limiter import TokenBucket
+from utils.response_cache import ResponseCache
+
+COOLDOWN = 0.3
+REQUEST_TIMEOUT = 1.0
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    """Fake YouTube API with a fresh breaker, limiter and fetch pool for each test"""
+    executor = ThreadPoolExecutor(max_workers=8)
+    with FakeYouTubeServer() as server:
+        monkeypatch.setenv("YOUTUBE_API_KEY", "fake-key")
+        monkeypatch.setattr(fetch_courses, "YOUTUBE_SEARCH_URL", server.search_url)
+        monkeypatch.setattr(fetch_courses, "YOUTUBE_REQUEST_TIMEOUT", REQUEST_TIMEOUT)
+        monkeypatch.setattr(fetch_courses, "YOUTUBE_STRAGGLER_WAIT", 0.1)
+        monkeypatch.setattr(fetch_courses, "_executor", executor)
+        monkeypatch.setattr(fetch_courses, "_youtube_limiter", TokenBucket(1000, 1000))
+        monkeypatch.setattr(fetch_courses, "_youtube_breaker", CircuitBreaker("YouTube", 3, COOLDOWN))
+        yield server
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the background refresh"
+        time.sleep(0.01)
+
+
+def search(query="python complete course"):
+    return fetch_courses.search_youtube("Python", query, "fake-key")
+
+
+def test_circuit_opens_then_half_opens_then_closes(youtube):
+    breaker = fetch_courses._youtube_breaker
+    youtube.error_rate = 1.0
+    for _ in range(3):
+        assert search() == []
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Open: searches are skipped without reaching the API
+    requests_before = youtube.request_count
+    assert search() == []
+    assert youtube.request_count == requests_before
+
+    time.sleep(COOLDOWN)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    # A failed trial opens the circuit again
+    assert search() == []
+    assert breaker.state == CircuitBreaker.OPEN
+    assert youtube.request_count == requests_before + 1
+
+    time.sleep(COOLDOWN)
+    youtube.error_rate = 0.0
+    assert len(search()) == 3
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_straggler_wait_returns_partial_results(youtube):
+    # seed 0: exactly one of the first three requests is fast
+    youtube.slow_rate = 0.5
+    youtube.slow_latency = 2 * REQUEST_TIMEOUT
+
+    start = time.monotonic()
+    futures = fetch_courses.submit_youtube_searches("Python", "fake-key")
+    results = fetch_courses.collect_youtube_results("Python", futures, time.monotonic() + 5)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < REQUEST_TIMEOUT
+    assert [len(videos) for videos in results] == [3]
+
+
+def test_budget_deadline_returns_what_arrived(youtube):
+    youtube.slow_rate = 1.0
+    youtube.slow_latency = 2 * REQUEST_TIMEOUT
+
+    start = time.monotonic()
+    courses = fetch_courses.load_youtube_courses("Python", budget=0.2)
+    elapsed = time.monotonic() - start
+
+    assert courses == []
+    assert elapsed < REQUEST_TIMEOUT
+
+
+def test_response_cache_ttl_and_stale_while_revalidate(youtube, tmp_path, monkeypatch):
+    path = str(tmp_path / "youtube_cache.db")
+    cache = ResponseCache(path, ttl=0.3, stale_ttl=0.6)
+    monkeypatch.setenv("YOUTUBE_CACHE_PATH", path)
+    monkeypatch.setattr(fetch_courses, "_youtube_cache", cache)
+
+    fresh = search()
+    assert len(fresh) == 3
+    assert search() == fresh
+    assert youtube.request_count == 1
+    assert cache.stats["fresh_hits"] == 1
+
+    # Stale: served at once, even while the API fails; the failed refresh keeps the entry
+    time.sleep(0.35)
+    youtube.error_rate = 1.0
+    assert search() == fresh
+    assert cache.stats["stale_hits"] == 1
+    wait_until(lambda: youtube.error_count == 1)
+    assert cache.stats["refreshes"] == 0
+
+    youtube.error_rate = 0.0
+    wait_until(lambda: not cache._refreshing)
+    assert search() == fresh
+    wait_until(lambda: cache.stats["refreshes"] == 1)
+    assert youtube.request_count == 3
+
+    # Past ttl + stale_ttl the entry is a miss and the search goes out again
+    time.sleep(1.0)
+    requests_before = youtube.request_count
+    assert search() == fresh
+    assert youtube.request_count == requests_before + 1
+    assert cache.stats["misses"] == 2
+
+
+def test_token_bucket_paces_requests(youtube, monkeypatch):
+    monkeypatch.setattr(fetch_courses, "_youtube_limiter", TokenBucket(10, 2))
+
+    start = time.monotonic()
+    futures = [fetch_courses._executor.submit(search, f"python query {i}") for i in range(6)]
+    results = [future.result() for future in futures]
+    elapsed = time.monotonic() - start
+
+    # A burst of 2, then 4 more at 10 per second
+    assert all(len(videos) == 3 for videos in results)
+    assert elapsed >= 0.35
+    assert youtube.request_count == 6
+
+
+def test_token_bucket_timeout_skips_the_request(youtube, monkeypatch):
+    monkeypatch.setattr(fetch_courses, "_youtube_limiter", TokenBucket(0.1, 1))
+    monkeypatch.setattr(fetch_courses, "YOUTUBE_REQUEST_TIMEOUT", 0.1)
+
+    assert len(search("python query 1")) == 3
+    assert search("python query 2") == []
+    assert youtube.request_count == 1
+    assert fetch_courses._youtube_breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,56 @@
+# tests/test_skill_cache.py
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.skill_cache import GoalSkillCache
+
+
+def test_least_recently_used_goals_are_evicted(tmp_path, embedding_model):
+    cache = GoalSkillCache(str(tmp_path / "skills.db"), max_entries=2)
+    cache.store("Become a data analyst", ["Sql"])
+    cache.store("Become a web developer", ["Javascript"])
+    assert cache.lookup("become a data analyst!") == ["Sql"]
+
+    cache.store("Become a cloud engineer", ["Aws"])
+
+    assert cache.stats["evictions"] == 1
+    assert cache.lookup("Become a web developer") is None
+    assert cache.lookup("Become a data analyst") == ["Sql"]
+    assert cache.lookup("Become a cloud engineer") == ["Aws"]
+
+
+def test_semantic_lookups_during_concurrent_stores(tmp_path, embedding_model):
+    cache = GoalSkillCache(str(tmp_path / "skills.db"), similarity_threshold=0.5, max_entries=50)
+    cache.store("I want to become a data scientist", ["Python", "Statistics"])
+
+    def store(i):
+        cache.store(f"Learn gardening topic {i}", ["Gardening"])
+
+    def lookup(_):
+        return cache.lookup("I really want to become a data scientist")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        stores = [pool.submit(store, i) for i in range(40)]
+        lookups = [pool.submit(lookup, i) for i in range(40)]
+        for future in stores:
+            future.result()
+        assert all(future.result() == ["Python", "Statistics"] for future in lookups)
+
+
+def test_opens_a_cache_written_before_the_size_bound(tmp_path, embedding_model):
+    path = str(tmp_path / "skills.db")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE goals (normalized TEXT PRIMARY KEY, goal TEXT NOT NULL, skills TEXT NOT NULL, "
+        "embedding BLOB, created REAL NOT NULL)"
+    )
+    db.execute("INSERT INTO goals VALUES ('become a data analyst', 'Become a data analyst', '[\"Sql\"]', NULL, ?)",
+               (time.time(),))
+    db.commit()
+    db.close()
+
+    cache = GoalSkillCache(path, max_entries=1)
+    assert cache.lookup("Become a data analyst") == ["Sql"]
+    cache.store("Become a web developer", ["Javascript"])
+    assert cache.lookup("Become a data analyst") is None
@@ -0,0 +1,97 @@
+# tests/test_skill_extraction.py
+import pytest
+
+from benchmarks.fake_models import FakeGenerativeModel
+from utils import skills_extractor
+from utils.extraction_scheduler import ExtractionScheduler
+from utils.skill_cache import GoalSkillCache
+
+WINDOW = 0.2
+GOALS = [f"I want to become a data engineer at company {i}" for i in range(8)]
+
+
+def expected(model, goal):
+    """Skills the fake model returns for a goal, as extraction title-cases them"""
+    return [skill.title() for skill in model.skills_for(goal)]
+
+
+class FailingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        raise RuntimeError("Gemini is down")
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """Fake Gemini model behind a fresh scheduler; assign skills_extractor._model to swap it"""
+    model = FakeGenerativeModel()
+    scheduler = ExtractionScheduler(skills_extractor.get_gemini_model, window=WINDOW, max_batch=16)
+    monkeypatch.setattr(skills_extractor, "SKILL_BATCHING", True)
+    monkeypatch.setattr(skills_extractor, "_model", model)
+    monkeypatch.setattr(skills_extractor, "_scheduler", scheduler)
+    yield model
+    scheduler._executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def skill_cache(monkeypatch, tmp_path, embedding_model):
+    path = str(tmp_path / "skills_cache.db")
+    cache = GoalSkillCache(path)
+    monkeypatch.setenv("SKILL_CACHE_PATH", path)
+    monkeypatch.setattr(skills_extractor, "_skill_cache", cache)
+    return cache
+
+
+def test_concurrent_goals_share_one_prompt(gemini, skill_cache):
+    results = skills_extractor.extract_skills_many(GOALS)
+
+    assert gemini.batch_sizes == [len(GOALS)]
+    assert results == [expected(gemini, goal) for goal in GOALS]
+
+    # Answers are cached, so the same goals don't reach the model again
+    assert skills_extractor.extract_skills_many(GOALS) == results
+    assert gemini.calls == 1
+
+
+def test_duplicate_goals_are_single_flight(gemini):
+    scheduler = skills_extractor.get_extraction_scheduler()
+    goal = "I want to become a data scientist"
+
+    results = scheduler.extract_many([goal, "  I want to become a DATA SCIENTIST! ", goal])
+
+    assert gemini.batch_sizes == [1]
+    assert scheduler.stats["coalesced"] == 2
+    assert results == [expected(gemini, goal)] * 3
+    assert results[0] is not results[2]
+
+
+def test_timeout_returns_fallback_without_caching(gemini, skill_cache, monkeypatch):
+    # The prompt goes out after the batching window and answers after the timeout
+    gemini.latency = 0.5
+    monkeypatch.setattr(skills_extractor, "EXTRACTION_TIMEOUT", WINDOW + 0.1)
+    goal = GOALS[0]
+
+    assert skills_extractor.extract_skills(goal) == skills_extractor.FALLBACK_SKILLS
+    assert skills_extractor.get_extraction_scheduler().stats["timeouts"] == 1
+
+    # The late answer is not stored either, so the goal is extracted again
+    skills_extractor.get_extraction_scheduler()._executor.shutdown(wait=True)
+    assert gemini.calls == 1
+    assert skill_cache.lookup(goal) is None
+
+
+def test_failed_batch_falls_back_and_is_retried(gemini, skill_cache, monkeypatch):
+    failing = FailingModel()
+    monkeypatch.setattr(skills_extractor, "_model", failing)
+    goal = GOALS[0]
+
+    assert skills_extractor.extract_skills(goal) == skills_extractor.FALLBACK_SKILLS
+    assert failing.calls == 1
+    assert skill_cache.lookup(goal) is None
+
+    monkeypatch.setattr(skills_extractor, "_model", gemini)
+    assert skills_extractor.extract_skills(goal) == expected(gemini, goal)
+    assert gemini.calls == 1
@@ -7,14 +7,152 @@ from dotenv import load_dotenv
 load_dotenv()
 from utils.env_loader import load_env_variables
 from utils.skills_extractor import extract_skills
-from utils.fetch_courses import load_course_data_from_all_sources
-from recommender.course_ranker import rank_all_skills
-from agents.planner_agent import generate_learning_plan
+from recommender.model_registry import warm_up
+from utils.progress_store import is_reusable
+from pipeline import iter_plan_weeks
 import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
 
 # Load environment variables for APIs
 load_env_variables()
 
+
+# === Cached pipeline stages ===
+# cache_resource: one model per process, shared by every session.
+# shared_plans: finished plans shared across sessions, keyed by skill set.
+# Skills are not cached here: extract_skills has its own goal cache, which
+# never stores the fallback list used while Gemini is unavailable.
+@st.cache_resource(show_spinner=False)
+def start_model_warm_up():
+    """Load the embedding model in the background while the page renders"""
+    return warm_up()
+
+
+SHARED_PLAN_TTL = 3600
+
+
+@st.cache_resource(show_spinner=False)
+def shared_plans():
+    """Finished plans keyed by skill tuple, shared by every session in the process"""
+    return threading.Lock(), OrderedDict()
+
+
+def get_shared_plan(skills):
+    """Plan another session built for these skills within SHARED_PLAN_TTL, if any"""
+    lock, plans = shared_plans()
+    with lock:
+        entry = plans.get(skills)
+        if entry is None:
+            return None
+        saved, plan = entry
+        if time.time() - saved > SHARED_PLAN_TTL:
+            del plans[skills]
+            return None
+        return plan
+
+
+def save_shared_plan(skills, plan, max_entries=1000):
+    """Share a plan with other sessions, unless a week is incomplete (placeholders, failed fetch)"""
+    if not all(is_reusable(data) for data in plan.values()):
+        return
+    lock, plans = shared_plans()
+    with lock:
+        plans[skills] = (time.time(), plan)
+        plans.move_to_end(skills)
+        while len(plans) > max_entries:
+            plans.popitem(last=False)
+
+
+def get_session_result(goal):
+    """Result for this goal computed earlier in the session, if any"""
+    return st.session_state.setdefault("results", {}).get(goal.strip().lower())
+
+
+def save_session_result(goal, result):
+    st.session_state.setdefault("results", {})[goal.strip().lower()] = result
+
+
+def render_week(week, data):
+    """Render one week of the plan as three platform cards"""
+    st.markdown(f"### 📚 Week {week}: {data['skill']}")
+    
+    if not data.get('resources'):
+        st.warning("⚠️ No resources found for this skill")
+        return
+    
+    # Create three columns for platforms
+    col1, col2, col3 = st.columns(3)
+    
+    # Define column mapping
+    columns = [col1, col2, col3]
+    platforms = ["coursera", "udemy", "youtube"]
+    platform_colors = {
+        "coursera": "#0056D2",
+        "udemy": "#EC5252", 
+        "youtube": "#FF0000"
+    }
+    platform_icons = {
+        "coursera": "🎓",
+        "udemy": "💻",
+        "youtube": "🎥"
+    }
+    
+    for idx, platform in enumerate(platforms):
+        with columns[idx]:
+            # Find course for this platform
+            course = next(
+                (c for c in data['resources'] if c.get("source", "").lower() == platform), 
+                None
+            )
+            
+            if course and course.get('url') != "#":
+                # Real course found
+                st.markdown(f"""
+                <div style="border: 2px solid {platform_colors[platform]}; border-radius: 10px; padding: 15px; margin-bottom: 10px;">
+                    <h4 style="color: {platform_colors[platform]}; margin-bottom: 10px;">
+                        {platform_icons[platform]} {platform.title()}
+                    </h4>
+                    <p style="font-weight: bold; margin-bottom: 5px;">{course['title']}</p>
+                    <p style="font-size: 0.9em; color: #666; margin-bottom: 10px;">{course.get('duration', 'Duration not specified')}</p>
+                    <a href="{course['url']}" target="_blank" style="
+                        background-color: {platform_colors[platform]}; 
+                        color: white; 
+                        padding: 8px 16px; 
+                        text-decoration: none; 
+                        border-radius: 5px; 
+                        font-size: 0.9em;
+                        display: inline-block;
+                    ">Start Course →</a>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                # Show relevance score if available
+                if course.get('relevance_score'):
+                    score = course['relevance_score']
+                    st.caption(f"Relevance: {score:.2f}/1.0")
+
+                # Other top-ranked courses from the same ranking pass
+                alternatives = course.get("alternatives") or []
+                if alternatives:
+                    with st.expander(f"{len(alternatives)} more on {platform.title()}"):
+                        for alt in alternatives:
+                            st.markdown(f"- [{alt['title']}]({alt['url']})")
+            else:
+                # Placeholder
+                st.markdown(f"""
+                <div style="border: 2px dashed #ccc; border-radius: 10px; padding: 15px; margin-bottom: 10px; text-align: center;">
+                    <h4 style="color: #999; margin-bottom: 10px;">
+                        {platform_icons[platform]} {platform.title()}
+                    </h4>
+                    <p style="color: #666;">Course coming soon...</p>
+                    <p style="font-size: 0.8em; color: #999;">Check back later for updates</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+
 st.set_page_config(page_title="Upskilling Agent", layout="wide")
 st.title("📘 Upskilling Recommendation Agent")
 st.write("Get a personalized learning roadmap based on your career goal.")
@@ -35,10 +173,22 @@ goal = st.text_input(
     help="Be specific about your goal for better skill extraction"
 )
 
+start_model_warm_up()
+
+result = None
+plan = None
+skills = []
+
 if goal:
-    # Step 1: Extract skills
-    with st.spinner("🧠 Extracting skills from your goal..."):
-        skills = extract_skills(goal)
+    result = get_session_result(goal)
+
+    if result is None:
+        # Step 1: Extract skills
+        with st.spinner("🧠 Extracting skills from your goal..."):
+            skills = extract_skills(goal)
+    else:
+        skills = result["skills"]
+        plan = result["plan"]
     
     st.subheader("🛠 Extracted Skills")
     if skills:
@@ -51,105 +201,50 @@ if goal:
         st.error("❌ Could not extract skills. Please try rephrasing your goal.")
         st.stop()
 
-    # Step 2: Fetch and rank courses
-    with st.spinner("🔍 Finding the best courses from all platforms..."):
+    # Steps 2-3: Fetch, rank and display the plan week by week
+    st.subheader("📅 Your Personalized Learning Plan")
+    st.info("💡 **Tip:** Click on course titles to open them in a new tab")
+
+    if result is None:
+        plan = get_shared_plan(tuple(skills))
+
+    if plan is None:
+        # Stream: each week renders as soon as its skill has been fetched and ranked
+        plan = {}
+        status = st.empty()
         try:
-            all_courses = load_course_data_from_all_sources(skills)
-            
-            if not all_courses:
-                st.error("❌ No courses found. Please check your API keys and try again.")
-                st.stop()
-            
-            recommendations = rank_all_skills(skills, all_courses)
-            plan = generate_learning_plan(goal, skills, recommendations)
-            
+            status.caption(f"🔍 Finding the best courses from all platforms... (0/{len(skills)})")
+            for week, data in iter_plan_weeks(goal, skills):
+                plan[week] = data
+                render_week(week, data)
+                status.caption(f"🔍 Finding the best courses from all platforms... ({week}/{len(skills)})")
+            status.empty()
         except Exception as e:
             st.error(f"❌ Error fetching courses: {str(e)}")
             st.stop()
 
-    # Step 3: Display learning plan
-    st.subheader("📅 Your Personalized Learning Plan")
-    st.info("💡 **Tip:** Click on course titles to open them in a new tab")
-    
-    for week, data in plan.items():
-        st.markdown(f"### 📚 Week {week}: {data['skill']}")
-        
-        if not data.get('resources'):
-            st.warning("⚠️ No resources found for this skill")
-            continue
-        
-        # Create three columns for platforms
-        col1, col2, col3 = st.columns(3)
-        
-        # Define column mapping
-        columns = [col1, col2, col3]
-        platforms = ["coursera", "udemy", "youtube"]
-        platform_colors = {
-            "coursera": "#0056D2",
-            "udemy": "#EC5252", 
-            "youtube": "#FF0000"
-        }
-        platform_icons = {
-            "coursera": "🎓",
-            "udemy": "💻",
-            "youtube": "🎥"
-        }
-        
-        for idx, platform in enumerate(platforms):
-            with columns[idx]:
-                # Find course for this platform
-                course = next(
-                    (c for c in data['resources'] if c.get("source", "").lower() == platform), 
-                    None
-                )
-                
-                if course and course.get('url') != "#":
-                    # Real course found
-                    st.markdown(f"""
-                    <div style="border: 2px solid {platform_colors[platform]}; border-radius: 10px; padding: 15px; margin-bottom: 10px;">
-                        <h4 style="color: {platform_colors[platform]}; margin-bottom: 10px;">
-                            {platform_icons[platform]} {platform.title()}
-                        </h4>
-                        <p style="font-weight: bold; margin-bottom: 5px;">{course['title']}</p>
-                        <p style="font-size: 0.9em; color: #666; margin-bottom: 10px;">{course.get('duration', 'Duration not specified')}</p>
-                        <a href="{course['url']}" target="_blank" style="
-                            background-color: {platform_colors[platform]}; 
-                            color: white; 
-                            padding: 8px 16px; 
-                            text-decoration: none; 
-                            border-radius: 5px; 
-                            font-size: 0.9em;
-                            display: inline-block;
-                        ">Start Course →</a>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Show relevance score if available
-                    if course.get('relevance_score'):
-                        score = course['relevance_score']
-                        st.caption(f"Relevance: {score:.2f}/1.0")
-                else:
-                    # Placeholder
-                    st.markdown(f"""
-                    <div style="border: 2px dashed #ccc; border-radius: 10px; padding: 15px; margin-bottom: 10px; text-align: center;">
-                        <h4 style="color: #999; margin-bottom: 10px;">
-                            {platform_icons[platform]} {platform.title()}
-                        </h4>
-                        <p style="color: #666;">Course coming soon...</p>
-                        <p style="font-size: 0.8em; color: #999;">Check back later for updates</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+        if not any(r.get("url") != "#" for data in plan.values() for r in data["resources"]):
+            st.error("❌ No courses found. Please check your API keys and try again.")
+            st.stop()
+        save_shared_plan(tuple(skills), plan)
+    else:
+        for week, data in plan.items():
+            render_week(week, data)
+
+    if result is None:
+        result = {"skills": skills, "plan": plan, "timestamp": datetime.now().isoformat()}
+        save_session_result(goal, result)
 
 # Step 4: Export functionality
 st.subheader("💾 Export Your Plan")
 
 # Only show Export to JSON
-if st.button("📄 Export as JSON", type="secondary"):
+if plan and st.button("📄 Export as JSON", type="secondary"):
     user_data = {
         "goal": goal,
         "skills": skills,
         "learning_plan": plan,
-        "generated_at": str(st.session_state.get('timestamp', 'Unknown'))
+        "generated_at": get_session_result(goal).get("timestamp", "Unknown")
     }
 
     json_str = json.dumps(user_data, indent=2)
@@ -0,0 +1,83 @@
+# utils/circuit_breaker.py
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are refused for `cooldown` seconds. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, name, failure_threshold=5, cooldown=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        True if a call may go out now. A half-open circuit admits one trial at a
+        time; a trial that never reports back is replaced after another cooldown.
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == self.OPEN:
+                if now - self._opened_at < self.cooldown:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._trial_started is not None and now - self._trial_started < self.cooldown:
+                return False
+            self._trial_started = now
+            return True
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go out now"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open, skipping call")
+
+    def release(self):
+        """Give back a half-open trial slot for a call that never reached the upstream"""
+        with self._lock:
+            self._trial_started = None
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.OPEN:
+                return  # a straggler sent before the circuit opened; wait for the trial
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_started = None
+
+    def record_failure(self):
+        """Count a failure; returns True if this opened the circuit"""
+        with self._lock:
+            self._failures += 1
+            self._trial_started = None
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                opened = self._state != self.OPEN
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                return opened
+            return False
@@ -0,0 +1,159 @@
+# utils/extraction_scheduler.py
+"""
+Coalescing scheduler for Gemini skill extraction.
+
+Goals submitted within a short window are sent together as one structured
+prompt that returns a JSON object of per-goal skill lists. Identical goals
+already in flight share the same request (single-flight), at most
+`max_concurrent` prompts run at once, and callers wait at most `timeout`
+seconds before giving up (extract_skills then uses its fallback list).
+
+The model is any object with generate_content(prompt) -> response.text, so
+the scheduler runs unchanged against benchmarks.fake_models.FakeGenerativeModel:
+
+    scheduler = ExtractionScheduler(lambda: FakeGenerativeModel())
+    scheduler.extract_many(["I want to become a data scientist", ...])
+"""
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from utils import metrics
+from utils.skill_cache import normalize_goal
+
+BATCH_PROMPT = """
+You are an expert career assistant.
+For each career goal below, generate a list of 5 to 7 clean, search-friendly skills or topics the user should learn.
+
+✅ Each skill should match common course titles on platforms like Coursera and Udemy
+✅ Use short, direct names (e.g., "Python", "Data Science", "Machine Learning")
+❌ Do not return grouped skills (like "Programming (Python, Java)")
+
+Goals (JSON object of id -> goal):
+{goals}
+
+Return only a JSON object mapping every id to its list of skills, e.g. {{"1": ["Python", "SQL"]}}, with no explanation or formatting.
+"""
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def build_batch_prompt(goals):
+    """One prompt for several goals, numbered from 1"""
+    numbered = {str(i): goal for i, goal in enumerate(goals, 1)}
+    return BATCH_PROMPT.format(goals=json.dumps(numbered, ensure_ascii=False))
+
+
+def parse_batch_response(text, count):
+    """
+    Per-goal skill lists from a batch response, in goal order.
+    Goals missing from the response (or with a malformed entry) get None.
+    """
+    data = json.loads(_FENCE_RE.sub("", text.strip()))
+    results = []
+    for i in range(1, count + 1):
+        skills = data.get(str(i)) if isinstance(data, dict) else None
+        if isinstance(skills, list):
+            results.append([str(s).strip().title() for s in skills if str(s).strip()])
+        else:
+            results.append(None)
+    return results
+
+
+class ExtractionScheduler:
+    """Batches concurrent goals into shared Gemini prompts"""
+
+    def __init__(self, get_model, window=0.025, max_batch=16, max_concurrent=4):
+        self.get_model = get_model
+        self.window = window
+        self.max_batch = max_batch
+        self.stats = {"goals": 0, "coalesced": 0, "batches": 0, "timeouts": 0}
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._pending = []
+        self._timer = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="gemini")
+
+    def submit(self, goal):
+        """Future resolving to the goal's skill list, or None if extraction failed"""
+        key = normalize_goal(goal)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                metrics.incr("skill_extraction_coalesced_total")
+                return future
+
+            future = Future()
+            self._inflight[key] = future
+            self._pending.append((key, goal, future))
+            self.stats["goals"] += 1
+
+            batch = None
+            if len(self._pending) >= self.max_batch:
+                batch = self._take_batch()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch:
+            self._executor.submit(self._run_batch, batch)
+        return future
+
+    def extract(self, goal, timeout=None):
+        """Skills for one goal, or None on failure or timeout"""
+        return self.extract_many([goal], timeout)[0]
+
+    def extract_many(self, goals, timeout=None):
+        """Skills for each goal (None where extraction failed or timed out)"""
+        futures = [self.submit(goal) for goal in goals]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        results = []
+        for future in futures:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                skills = future.result(timeout=remaining)
+                # Coalesced callers share one result; give each its own list
+                results.append(list(skills) if skills is not None else None)
+            except FutureTimeoutError:
+                self.stats["timeouts"] += 1
+                metrics.incr("skill_extraction_timeouts_total")
+                results.append(None)
+        return results
+
+    def _take_batch(self):
+        """Pop up to max_batch pending goals (called with the lock held)"""
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        return batch
+
+    def _flush(self):
+        with self._lock:
+            self._timer = None
+            batches = []
+            while self._pending:
+                batches.append(self._take_batch())
+        for batch in batches:
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch):
+        goals = [goal for _, goal, _ in batch]
+        self.stats["batches"] += 1
+        metrics.observe("gemini_batch_goals", len(goals), buckets=metrics.SIZE_BUCKETS)
+        try:
+            with metrics.timer("gemini_request_seconds"):
+                response = self.get_model().generate_content(build_batch_prompt(goals))
+            results = parse_batch_response(response.text, len(goals))
+            print(f"✅ Gemini extracted skills for {sum(r is not None for r in results)}/{len(goals)} goals")
+        except Exception as e:
+            print(f"❌ Gemini batch error ({len(goals)} goals): {e}")
+            results = [None] * len(goals)
+
+        for (key, _, future), skills in zip(batch, results):
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_result(skills)
@@ -1,155 +1,332 @@
 # utils/fetch_courses.py
-import requests
 import os
+import threading
 import time
-from urllib.parse import quote_plus
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from collections import Counter
 
+from recommender.course_model import Course
+from recommender.fallback_links import platform_search_links
+from utils import metrics
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.http_session import get_session
+from utils.rate_limiter import TokenBucket
+from utils.response_cache import ResponseCache, make_cache_key
+
+# Overridable so the fetch path can run against a local fake API
+YOUTUBE_SEARCH_URL = os.getenv("YOUTUBE_SEARCH_URL", "https://www.googleapis.com/youtube/v3/search")
+
+# Response cache for YouTube searches; set YOUTUBE_CACHE_PATH="" to disable
+DEFAULT_YOUTUBE_CACHE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "memory", "youtube_cache.db")
+)
+
+# Fetch concurrency and YouTube API rate (requests/second, burst size)
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", 8))
+YOUTUBE_REQUESTS_PER_SECOND = float(os.getenv("YOUTUBE_REQUESTS_PER_SECOND", 5))
+YOUTUBE_BURST = float(os.getenv("YOUTUBE_BURST", 10))
+# Quota cost of one search.list call in YouTube Data API units
+YOUTUBE_SEARCH_QUOTA_COST = 100
+metrics.describe("youtube_quota_units_total", "YouTube Data API quota units spent by search calls")
+
+# Deadlines: per YouTube request, for all live fetches of one call, and how long
+# a skill's other query variants may lag behind the first one that returned videos
+YOUTUBE_REQUEST_TIMEOUT = float(os.getenv("YOUTUBE_REQUEST_TIMEOUT", 5))
+YOUTUBE_FETCH_BUDGET = float(os.getenv("YOUTUBE_FETCH_BUDGET", 8))
+YOUTUBE_STRAGGLER_WAIT = float(os.getenv("YOUTUBE_STRAGGLER_WAIT", 1))
+# Consecutive failures (errors, timeouts, 5xx, quota) that open the YouTube
+# circuit, and how long searches are skipped once it is open
+YOUTUBE_BREAKER_FAILURES = int(os.getenv("YOUTUBE_BREAKER_FAILURES", 5))
+YOUTUBE_BREAKER_COOLDOWN = float(os.getenv("YOUTUBE_BREAKER_COOLDOWN", 30))
+
+# Local catalogue results per skill, and whether live fetchers enrich them
+CATALOGUE_TOP_K = int(os.getenv("CATALOGUE_TOP_K", 10))
+LIVE_COURSE_FETCH = os.getenv("LIVE_COURSE_FETCH", "1") != "0"
+
+# Distinct videos kept per skill across all query variants; the ranker picks
+# the best one and keeps the rest as alternatives
+YOUTUBE_MAX_VIDEOS_PER_SKILL = int(os.getenv("YOUTUBE_MAX_VIDEOS_PER_SKILL", 9))
+
+_executor = None
+_youtube_cache = None
+_youtube_limiter = TokenBucket(YOUTUBE_REQUESTS_PER_SECOND, YOUTUBE_BURST)
+_youtube_breaker = CircuitBreaker("YouTube", YOUTUBE_BREAKER_FAILURES, YOUTUBE_BREAKER_COOLDOWN)
+_executor_lock = threading.Lock()
+
+
+def get_fetch_executor():
+    """Bounded thread pool shared by all fetches in this process"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix="fetch")
+    return _executor
+
+
+def get_youtube_cache():
+    """Shared YouTube response cache, or None when caching is disabled"""
+    global _youtube_cache
+    path = os.getenv("YOUTUBE_CACHE_PATH", DEFAULT_YOUTUBE_CACHE_PATH)
+    if not path:
+        return None
+    if _youtube_cache is None:
+        with _executor_lock:
+            if _youtube_cache is None:
+                _youtube_cache = ResponseCache(
+                    path,
+                    ttl=float(os.getenv("YOUTUBE_CACHE_TTL", 6 * 3600)),
+                    stale_ttl=float(os.getenv("YOUTUBE_CACHE_STALE_TTL", 24 * 3600)),
+                    max_entries=int(os.getenv("YOUTUBE_CACHE_MAX_ENTRIES", 5000)),
+                )
+    return _youtube_cache
+
+
 def generate_platform_search_links(skill, platform):
-    """Generate Google search links for a specific platform"""
-    platform_domains = {
-        "coursera": "coursera.org",
-        "udemy": "udemy.com",
-        "edx": "edx.org",
-        "khan-academy": "khanacademy.org"
-    }
-    
-    if platform not in platform_domains:
-        return []
-    
-    domain = platform_domains[platform]
-    courses = []
-    
-    search_variations = [
-        f"{skill} course",
-        f"{skill} tutorial",
-        f"learn {skill}",
-        f"{skill} certification"
-    ]
-    
-    for i, variation in enumerate(search_variations, 1):
-        search_query = f"site:{domain} {variation}"
-        encoded_query = quote_plus(search_query)
-        google_search_url = f"https://www.google.com/search?q={encoded_query}"
-        
-        courses.append({
-            "title": f"{skill} - {platform.title()} Search {i}",
-            "description": f"Search for '{variation}' on {platform.title()}",
-            "url": google_search_url,
-            "source": platform,
-            "duration": "Search Results",
-            "skill": skill,
-            "is_search_link": True
-        })
-    
-    print(f"✅ Generated {len(courses)} {platform} search links for '{skill}'")
+    """Generate Google search links for a specific platform (memoized per skill)"""
+    courses = platform_search_links(skill, platform)
+    if courses:
+        print(f"✅ Generated {len(courses)} {platform} search links for '{skill}'")
     return courses
 
-def load_youtube_courses(skill):
-    """Fetch specific YouTube videos (direct play links)"""
-    api_key = os.getenv("YOUTUBE_API_KEY")
-    if not api_key:
-        print("❌ YouTube API key not configured")
-        return []
-
-    search_url = "https://www.googleapis.com/youtube/v3/search"
-    
-    # Targeted queries to find actual course videos
-    search_queries = [
+def youtube_search_queries(skill):
+    """Targeted queries to find actual course videos"""
+    return [
         f"{skill} complete course",
         f"{skill} full tutorial",
         f"learn {skill} step by step"
     ]
-    
+
+def parse_youtube_videos(data, skill):
+    """Turn a YouTube search response into Course records"""
     videos = []
-    
-    for query in search_queries:
-        params = {
-            "part": "snippet",
-            "q": query,
-            "type": "video",
-            "maxResults": 3,
-            "key": api_key,
-            "order": "relevance",
-            "videoDuration": "long",
-            "videoEmbeddable": "true"
-        }
+    for item in data.get("items", []):
+        video_id = item["id"].get("videoId")
+        if not video_id:
+            continue
+
+        # Create PROPER direct video URL
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
+
+        videos.append(Course(
+            title=item["snippet"].get("title", "").strip(),
+            description=item["snippet"].get("description", "")[:200] + "...",
+            url=video_url,
+            source="youtube",
+            duration="Video Course",
+            channel=item["snippet"].get("channelTitle", ""),
+            skill=skill,
+            is_search_link=False
+        ))
+    return videos
+
+def record_youtube_failure():
+    if _youtube_breaker.record_failure():
+        print(f"🔌 YouTube circuit opened: skipping searches for {YOUTUBE_BREAKER_COOLDOWN:.0f}s")
+        metrics.incr("youtube_circuit_opened_total")
 
+def search_youtube(skill, query, api_key):
+    """Run a single YouTube search (cached), waiting for a rate-limit token before calling out"""
+    params = {
+        "part": "snippet",
+        "q": query,
+        "type": "video",
+        "maxResults": 3,
+        "key": api_key,
+        "order": "relevance",
+        "videoDuration": "long",
+        "videoEmbeddable": "true"
+    }
+
+    def request():
+        _youtube_breaker.check()
+        if not _youtube_limiter.acquire(timeout=YOUTUBE_REQUEST_TIMEOUT):
+            _youtube_breaker.release()
+            raise TimeoutError("timed out waiting for a YouTube rate-limit token")
+        metrics.incr("youtube_quota_units_total", YOUTUBE_SEARCH_QUOTA_COST)
         try:
-            response = requests.get(search_url, params=params, timeout=15)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            for item in data.get("items", []):
-                video_id = item["id"].get("videoId")
-                if not video_id:
-                    continue
-                
-                # Create PROPER direct video URL
-                video_url = f"https://www.youtube.com/watch?v={video_id}"
-                
-                videos.append({
-                    "title": item["snippet"].get("title", "").strip(),
-                    "description": item["snippet"].get("description", "")[:200] + "...",
-                    "url": video_url,  # This is the critical fix
-                    "source": "youtube",
-                    "duration": "Video Course",
-                    "channel": item["snippet"].get("channelTitle", ""),
-                    "skill": skill,
-                    "is_search_link": False
-                })
-            
-            time.sleep(1)
-            
-        except Exception as e:
-            print(f"❌ YouTube API error for '{skill}': {e}")
-            continue
-    
-    # Select only the best video (highest ranked by YouTube)
-    if videos:
-        best_video = videos[0]  # First result is most relevant
-        return [best_video]
-    if videos:
-        print(f"✅ Found YouTube video for '{skill}': {videos[0]['title']} → {videos[0]['url']}")
-        return [videos[0]]
-    else:
-        print(f"❌ No YouTube videos found for '{skill}'")
+            with metrics.timer("youtube_request_seconds"):
+                response = get_session().get(YOUTUBE_SEARCH_URL, params=params, timeout=YOUTUBE_REQUEST_TIMEOUT)
+        except Exception:
+            record_youtube_failure()
+            raise
+        metrics.incr("youtube_requests_total", status=str(response.status_code))
+        if response.status_code >= 500 or response.status_code in (403, 429):
+            record_youtube_failure()  # server error or quota exhausted
+        else:
+            _youtube_breaker.record_success()
+        response.raise_for_status()
+        return response.json()
+
+    try:
+        cache = get_youtube_cache()
+        if cache is None:
+            data = request()
+        else:
+            key = make_cache_key(YOUTUBE_SEARCH_URL, params)
+            data = cache.get_or_fetch(key, request, refresh_executor=get_fetch_executor())
+        return parse_youtube_videos(data, skill)
+    except CircuitOpenError:
+        metrics.incr("youtube_errors_total", error="CircuitOpenError")
         return []
+    except Exception as e:
+        print(f"❌ YouTube API error for '{skill}': {e}")
+        metrics.incr("youtube_errors_total", error=type(e).__name__)
+        return []
+
+def select_youtube_videos(skill, results_per_query):
+    """
+    Distinct videos from the per-query results, in query order (YouTube's own
+    ranking first), capped at YOUTUBE_MAX_VIDEOS_PER_SKILL
+    """
+    videos, seen = [], set()
+    for results in results_per_query:
+        for video in results:
+            if video["url"] not in seen:
+                seen.add(video["url"])
+                videos.append(video)
+    videos = videos[:YOUTUBE_MAX_VIDEOS_PER_SKILL]
 
+    if videos:
+        print(f"✅ Found {len(videos)} YouTube videos for '{skill}', top: {videos[0]['title']} → {videos[0]['url']}")
+        return videos
+
+    print(f"❌ No YouTube videos found for '{skill}'")
     return []
 
-def load_course_data_from_all_sources(skills=None):
-    """Load courses from all sources using Google search links and YouTube API"""
-    print("🔄 Loading course data from all sources...")
-    
-    all_courses = []
-    
-    if skills:
+def submit_youtube_searches(skill, api_key):
+    """Start all query variants for a skill on the shared fetch pool"""
+    executor = get_fetch_executor()
+    return [
+        executor.submit(search_youtube, skill, query, api_key)
+        for query in youtube_search_queries(skill)
+    ]
+
+def fetch_deadline(request_count, budget=None):
+    """
+    Deadline for a batch of YouTube searches: the budget (YOUTUBE_FETCH_BUDGET)
+    plus the time the rate limiter needs to let requests beyond the burst out
+    """
+    budget = YOUTUBE_FETCH_BUDGET if budget is None else budget
+    pacing = max(request_count - YOUTUBE_BURST, 0) / YOUTUBE_REQUESTS_PER_SECOND
+    return time.monotonic() + budget + pacing
+
+def collect_youtube_results(skill, futures, deadline=None):
+    """
+    Per-query results of a skill's searches that are ready in time, in query order.
+    Once one query has returned videos the others get at most YOUTUBE_STRAGGLER_WAIT
+    more, and nothing is waited for past the deadline. Late searches are left to
+    finish in the background (filling the cache); queued ones are cancelled.
+    """
+    until = deadline
+    first_videos = False
+    pending = set(futures)
+    while pending:
+        timeout = None if until is None else max(until - time.monotonic(), 0)
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        if not first_videos and any(future.result() for future in done):
+            first_videos = True
+            straggler_until = time.monotonic() + YOUTUBE_STRAGGLER_WAIT
+            until = straggler_until if until is None else min(until, straggler_until)
+
+    if pending:
+        for future in pending:
+            future.cancel()
+        metrics.incr("youtube_partial_results_total")
+        print(f"⏱️ Using {len(futures) - len(pending)}/{len(futures)} YouTube queries for '{skill}'")
+    return [future.result() for future in futures if future.done() and not future.cancelled()]
+
+def load_youtube_courses(skill, budget=None):
+    """Fetch specific YouTube videos (direct play links) within the fetch budget"""
+    api_key = os.getenv("YOUTUBE_API_KEY")
+    if not api_key:
+        print("❌ YouTube API key not configured")
+        return []
+
+    futures = submit_youtube_searches(skill, api_key)
+    deadline = fetch_deadline(len(futures), budget)
+    return select_youtube_videos(skill, collect_youtube_results(skill, futures, deadline))
+
+def load_catalogue_courses(skills, catalogue=None):
+    """Top-k courses per skill from the local catalogue (empty when none is configured)"""
+    if catalogue is None:
+        from recommender.catalogue import get_default_catalogue
+        catalogue = get_default_catalogue()
+    if catalogue is None or not skills:
+        return {}
+
+    courses = catalogue.courses_for_skills(skills, CATALOGUE_TOP_K)
+    print(f"📚 Found {sum(len(c) for c in courses.values())} catalogue courses for {len(skills)} skills")
+    return courses
+
+def iter_course_data_from_all_sources(skills=None, catalogue=None, live=None, budget=None):
+    """
+    Yield (skill, courses) pairs in skill order, each as soon as that skill's
+    courses are ready. All live requests are started up front, so the first
+    skill arrives after about one round trip rather than after every skill.
+    Live results not ready within `budget` seconds (YOUTUBE_FETCH_BUDGET, plus
+    rate-limit pacing) are left out, and ranking proceeds with what arrived.
+    """
+    if not skills:
+        return
+    if live is None:
+        live = LIVE_COURSE_FETCH
+
+    try:
+        catalogue_courses = load_catalogue_courses(skills, catalogue)
+    except Exception as e:
+        print(f"❌ Catalogue lookup failed: {e}")
+        catalogue_courses = {}
+
+    # Fan out every skill x query search up front; the token bucket paces them
+    youtube_futures = {}
+    deadline = None
+    if live:
         print(f"📚 Generating course links for skills: {skills}")
-        
-        for i, skill in enumerate(skills):
-            print(f"🔍 Processing skill {i+1}/{len(skills)}: {skill}")
-            
+
+        api_key = os.getenv("YOUTUBE_API_KEY")
+        if not api_key:
+            print("❌ YouTube API key not configured")
+        else:
+            for skill in skills:
+                youtube_futures[skill] = submit_youtube_searches(skill, api_key)
+            deadline = fetch_deadline(sum(len(futures) for futures in youtube_futures.values()), budget)
+
+    for i, skill in enumerate(skills):
+        print(f"🔍 Processing skill {i+1}/{len(skills)}: {skill}")
+        skill_courses = list(catalogue_courses.get(skill, []))
+
+        if live:
             try:
                 # Generate platform search links
                 for platform in ["coursera", "udemy"]:
                     platform_links = generate_platform_search_links(skill, platform)
                     if platform_links:
-                        all_courses.extend(platform_links)
-                
-                # Get YouTube courses (real API data)
-                youtube_courses = load_youtube_courses(skill)
-                if youtube_courses:
-                    all_courses.extend(youtube_courses)
-                
-                # Add delay between skills to avoid rate limiting
-                if i < len(skills) - 1:
-                    time.sleep(1)
-                    
+                        skill_courses.extend(platform_links)
+
+                # Collect YouTube courses (real API data)
+                if skill in youtube_futures:
+                    results = collect_youtube_results(skill, youtube_futures[skill], deadline)
+                    skill_courses.extend(select_youtube_videos(skill, results))
+
             except Exception as e:
                 print(f"❌ Error processing skill '{skill}': {e}")
-                continue
+
+        yield skill, skill_courses
+
+def load_course_data_from_all_sources(skills=None, catalogue=None, live=None, budget=None):
+    """
+    Load courses from the local catalogue (if configured) and from all live sources
+    using Google search links and YouTube API. Live fetching is an enrichment step
+    that can be turned off with live=False or LIVE_COURSE_FETCH=0.
+    """
+    print("🔄 Loading course data from all sources...")
+    
+    all_courses = []
+    for _, skill_courses in iter_course_data_from_all_sources(skills, catalogue, live, budget):
+        all_courses.extend(skill_courses)
     
     print(f"✅ Total course links generated: {len(all_courses)}")
     print("📊 Course sources count:", Counter([c.get("source", "unknown") for c in all_courses]))
@@ -0,0 +1,27 @@
+# utils/http_session.py
+import os
+import threading
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Shared requests session with a connection pool sized for concurrent fetches.
+    Reusing it keeps TCP/TLS connections to the APIs alive between calls.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                pool_size = int(os.getenv("HTTP_POOL_SIZE", 16))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
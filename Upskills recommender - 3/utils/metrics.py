@@ -0,0 +1,200 @@
+# utils/metrics.py
+"""
+In-process metrics: counters and histograms with labels.
+
+    from utils import metrics
+    metrics.incr("youtube_requests_total", status="ok")
+    with metrics.timer("skill_extraction_seconds"):
+        ...
+
+Exposed as Prometheus text (render_prometheus(), served by the API on
+/metrics) or as a JSON snapshot. Set METRICS_JSON_LOG to a file path to also
+append one JSON line per observation.
+
+profile_request() captures a full profile (pyinstrument if installed, else
+cProfile) for a single request when PROFILING_ENABLED=1.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_help = {}
+_json_log_lock = threading.Lock()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _json_log(kind, name, value, labels):
+    path = os.getenv("METRICS_JSON_LOG")
+    if not path:
+        return
+    line = json.dumps({"ts": time.time(), "type": kind, "name": name, "value": value, "labels": labels})
+    with _json_log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def describe(name, text):
+    """Attach a HELP line to a metric"""
+    _help[name] = text
+
+
+def incr(name, value=1, **labels):
+    """Increase a counter"""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    _json_log("counter", name, value, labels)
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS, **labels):
+    """Record a value (seconds by default) in a histogram"""
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            _histograms[key] = histogram
+        for i, bound in enumerate(histogram["buckets"]):
+            if value <= bound:
+                histogram["counts"][i] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+    _json_log("histogram", name, value, labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    """Time a block into a latency histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def timed(name, **labels):
+    """Decorator form of timer()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format"""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: dict(v, counts=list(v["counts"])) for k, v in _histograms.items()}
+
+    lines = []
+    seen = set()
+    for (name, labels), value in sorted(counters.items()):
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), histogram in sorted(histograms.items()):
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+        for bound, count in zip(histogram["buckets"], histogram["counts"]):
+            lines.append(f"{name}_bucket{_format_labels(labels, {'le': bound})} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels, {'le': '+Inf'})} {histogram['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot():
+    """All metrics as a JSON-serializable dict"""
+    with _lock:
+        return {
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(_counters.items())
+            ],
+            "histograms": [
+                {"name": name, "labels": dict(labels), "count": h["count"], "sum": h["sum"],
+                 "buckets": dict(zip(map(str, h["buckets"]), h["counts"]))}
+                for (name, labels), h in sorted(_histograms.items())
+            ],
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def profiling_enabled():
+    return os.getenv("PROFILING_ENABLED", "0") == "1"
+
+
+@contextmanager
+def profile_request(name="request", enabled=True):
+    """
+    Capture a full profile of the enclosed block when PROFILING_ENABLED=1.
+    Writes an HTML report (pyinstrument) or a .prof file (cProfile) to
+    PROFILE_DIR and prints its path.
+    """
+    if not (enabled and profiling_enabled()):
+        yield None
+        return
+
+    directory = os.getenv("PROFILE_DIR", "profiles")
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield base + ".html"
+        finally:
+            profiler.stop()
+            with open(base + ".html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            print(f"🧪 Profile written to {base}.html")
+    else:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield base + ".prof"
+        finally:
+            profiler.disable()
+            profiler.dump_stats(base + ".prof")
+            print(f"🧪 Profile written to {base}.prof")
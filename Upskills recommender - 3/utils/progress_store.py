@@ -0,0 +1,234 @@
+# utils/progress_store.py
+"""
+Learner profiles, plan history and per-week progress in SQLite.
+
+Replaces the single-document memory/user_data.json: every table is keyed by
+user_id, progress updates touch one row, and plans are appended to a history
+table rather than rewritten. WAL mode lets several processes (Streamlit,
+API workers) read and write concurrently.
+
+Progress is stored per skill, so it survives re-planning: a completed skill
+is left out of the user's next plan, and recent entries from earlier plans
+that have real resource links are reused instead of being fetched and
+ranked again.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from recommender.course_index import normalize_skill
+from recommender.fallback_links import has_youtube_video
+from utils.fetch_courses import LIVE_COURSE_FETCH
+
+DEFAULT_PROGRESS_STORE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "memory", "progress.db")
+)
+LEGACY_USER_DATA_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "memory", "user_data.json")
+)
+
+STATUSES = ("not started", "in progress", "completed")
+# Weeks from plans older than this are fetched and ranked again
+DEFAULT_REUSE_MAX_AGE = 7 * 24 * 3600
+
+_store = None
+_lock = threading.Lock()
+
+
+class ProgressStore:
+    """SQLite-backed users, append-only plan history and per-skill progress"""
+
+    def __init__(self, path, reuse_max_age=DEFAULT_REUSE_MAX_AGE):
+        self.reuse_max_age = reuse_max_age
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "user_id TEXT PRIMARY KEY, goal TEXT, created REAL NOT NULL, updated REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "plan_id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, goal TEXT, "
+            "skills TEXT NOT NULL, learning_plan TEXT NOT NULL, created REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS plans_user ON plans(user_id, plan_id);"
+            "CREATE TABLE IF NOT EXISTS progress ("
+            "user_id TEXT NOT NULL, skill_key TEXT NOT NULL, skill TEXT NOT NULL, "
+            "status TEXT NOT NULL, updated REAL NOT NULL, PRIMARY KEY (user_id, skill_key));"
+        )
+        self._db.commit()
+
+    # --- users and plans -------------------------------------------------
+
+    def _touch_user(self, user_id, goal, now):
+        self._db.execute(
+            "INSERT INTO users (user_id, goal, created, updated) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET goal = COALESCE(excluded.goal, goal), "
+            "updated = excluded.updated",
+            (user_id, goal, now, now),
+        )
+
+    def save_plan(self, user_id, goal, skills, learning_plan):
+        """Append a plan to the user's history and return its plan_id"""
+        now = time.time()
+        with self._lock:
+            self._touch_user(user_id, goal, now)
+            cursor = self._db.execute(
+                "INSERT INTO plans (user_id, goal, skills, learning_plan, created) VALUES (?, ?, ?, ?, ?)",
+                (user_id, goal, json.dumps(skills), json.dumps(learning_plan), now),
+            )
+            self._db.commit()
+        return cursor.lastrowid
+
+    def plan_history(self, user_id, limit=None):
+        """The user's plans, newest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT plan_id, goal, skills, learning_plan, created FROM plans "
+                "WHERE user_id = ? ORDER BY plan_id DESC LIMIT ?",
+                (user_id, -1 if limit is None else limit),
+            ).fetchall()
+        return [
+            {"plan_id": plan_id, "goal": goal, "skills": json.loads(skills),
+             "learning_plan": json.loads(learning_plan), "created": created}
+            for plan_id, goal, skills, learning_plan, created in rows
+        ]
+
+    def latest_plan(self, user_id):
+        history = self.plan_history(user_id, limit=1)
+        return history[0] if history else None
+
+    # --- progress --------------------------------------------------------
+
+    def set_progress(self, user_id, skill, status):
+        """Record the status of one skill for a user"""
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status '{status}', expected one of {STATUSES}")
+        now = time.time()
+        with self._lock:
+            self._touch_user(user_id, None, now)
+            self._db.execute(
+                "INSERT OR REPLACE INTO progress (user_id, skill_key, skill, status, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, normalize_skill(skill), skill, status, now),
+            )
+            self._db.commit()
+
+    def set_week_progress(self, user_id, week, status):
+        """Record the status of a week of the user's latest plan; returns its skill"""
+        plan = self.latest_plan(user_id)
+        entry = plan["learning_plan"].get(str(week)) if plan else None
+        if entry is None:
+            raise KeyError(f"User '{user_id}' has no week {week} in their current plan")
+        self.set_progress(user_id, entry["skill"], status)
+        return entry["skill"]
+
+    def get_progress(self, user_id):
+        """{skill: status} for the user"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT skill, status FROM progress WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def get_user(self, user_id):
+        """
+        Profile in the old user_data.json shape: goal, skills and plan of the latest
+        plan, plus progress by week. None for unknown users.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT goal FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+
+        plan = self.latest_plan(user_id) or {"skills": [], "learning_plan": {}}
+        progress = {normalize_skill(skill): status for skill, status in self.get_progress(user_id).items()}
+        return {
+            "user_id": user_id,
+            "goal": row[0],
+            "skills": plan["skills"],
+            "learning_plan": plan["learning_plan"],
+            "progress": {
+                week: progress.get(normalize_skill(entry["skill"]), "not started")
+                for week, entry in plan["learning_plan"].items()
+            },
+        }
+
+    # --- planning --------------------------------------------------------
+
+    def plan_inputs(self, user_id, skills):
+        """
+        (skills not yet completed, {skill: plan entry from an earlier plan}) for
+        planning the user's next plan. The most recent earlier entry wins; only
+        entries younger than reuse_max_age with real resource links are reused.
+        """
+        with self._lock:
+            completed = {
+                key for (key,) in self._db.execute(
+                    "SELECT skill_key FROM progress WHERE user_id = ? AND status = 'completed'",
+                    (user_id,),
+                )
+            }
+        remaining = [skill for skill in skills if normalize_skill(skill) not in completed]
+
+        wanted = {normalize_skill(skill): skill for skill in remaining}
+        previous = {}
+        oldest = time.time() - self.reuse_max_age
+        for plan in self.plan_history(user_id):
+            if plan["created"] < oldest:
+                break
+            for entry in plan["learning_plan"].values():
+                skill = wanted.get(normalize_skill(entry.get("skill", "")))
+                if skill is not None and skill not in previous and is_reusable(entry):
+                    previous[skill] = dict(entry, skill=skill)
+            if len(previous) == len(wanted):
+                break
+        return remaining, previous
+
+    # --- migration -------------------------------------------------------
+
+    def import_user_data(self, path):
+        """Import a legacy user_data.json document (goal, plan and progress by week)"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        user_id = data.get("user_id", "default_user")
+        learning_plan = {str(week): entry for week, entry in data.get("learning_plan", {}).items()}
+        self.save_plan(user_id, data.get("goal"), data.get("skills", []), learning_plan)
+        for week, status in data.get("progress", {}).items():
+            entry = learning_plan.get(str(week))
+            if entry and status in STATUSES:
+                self.set_progress(user_id, entry["skill"], status)
+        return user_id
+
+    def is_empty(self):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+
+
+def is_reusable(entry):
+    """
+    True if a plan week has real resource links, not just placeholders (or, with
+    live fetching on, not just search links left by a failed YouTube fetch)
+    """
+    resources = [r for r in entry.get("resources", []) if r.get("url", "").startswith("http")]
+    return bool(resources) and (not LIVE_COURSE_FETCH or has_youtube_video(resources))
+
+
+def get_progress_store():
+    """
+    Shared progress store (PROGRESS_STORE_PATH, PROGRESS_REUSE_MAX_AGE). On first
+    use of an empty store, memory/user_data.json is imported if it exists.
+    """
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                store = ProgressStore(
+                    os.getenv("PROGRESS_STORE_PATH", DEFAULT_PROGRESS_STORE_PATH),
+                    reuse_max_age=float(os.getenv("PROGRESS_REUSE_MAX_AGE", DEFAULT_REUSE_MAX_AGE)),
+                )
+                if store.is_empty() and os.path.exists(LEGACY_USER_DATA_PATH):
+                    user_id = store.import_user_data(LEGACY_USER_DATA_PATH)
+                    print(f"📦 Imported {LEGACY_USER_DATA_PATH} for user '{user_id}'")
+                _store = store
+    return _store
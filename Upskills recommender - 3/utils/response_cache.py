@@ -0,0 +1,132 @@
+# utils/response_cache.py
+"""
+TTL cache for JSON API responses, stored in SQLite so several processes can share it.
+
+Entries younger than `ttl` are served as fresh. Entries between `ttl` and
+`ttl + stale_ttl` are served immediately while a background refresh replaces
+them (stale-while-revalidate). Older entries are treated as misses.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+
+def make_cache_key(url, params, ignore=("key",)):
+    """Key on the endpoint plus normalized params; the API key is not part of it"""
+    normalized = {}
+    for name, value in (params or {}).items():
+        if name in ignore:
+            continue
+        value = str(value)
+        if name == "q":
+            value = re.sub(r"\s+", " ", value).strip().lower()
+        normalized[name] = value
+    payload = json.dumps([url, normalized], sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed TTL cache with stale-while-revalidate and LRU size bound"""
+
+    def __init__(self, path, ttl=6 * 3600, stale_ttl=24 * 3600, max_entries=5000):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.stats = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+        self._db.commit()
+
+    def get(self, key):
+        """Return (value, is_fresh), or None when missing or past the stale window"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created = row
+            age = now - created
+            if age > self.ttl + self.stale_ttl:
+                return None
+
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        return json.loads(value), age <= self.ttl
+
+    def set(self, key, value):
+        """Store a response and evict least recently used entries beyond max_entries"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def get_or_fetch(self, key, fetch, refresh_executor=None):
+        """
+        Return a cached value or call fetch() and cache its result.
+        Stale values are returned immediately and refreshed in the background
+        (on refresh_executor, or a daemon thread if none is given).
+        """
+        cached = self.get(key)
+        if cached is not None:
+            value, is_fresh = cached
+            if is_fresh:
+                self.stats["fresh_hits"] += 1
+            else:
+                self.stats["stale_hits"] += 1
+                self._refresh_in_background(key, fetch, refresh_executor)
+            return value
+
+        self.stats["misses"] += 1
+        value = fetch()
+        self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key, fetch, executor):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.set(key, fetch())
+                self.stats["refreshes"] += 1
+            except Exception as e:
+                print(f"⚠️ Background refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        if executor is not None:
+            executor.submit(refresh)
+        else:
+            threading.Thread(target=refresh, daemon=True).start()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
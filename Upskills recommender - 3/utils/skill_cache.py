@@ -0,0 +1,151 @@
+# utils/skill_cache.py
+"""
+Persistent goal -> skills cache for extract_skills.
+
+Lookups try an exact match on the normalized goal first, then a semantic
+near-duplicate match using the MiniLM goal embeddings, so the LLM is only
+called for genuinely new goals. At most `max_entries` goals are kept; the
+least recently used ones are evicted.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+def normalize_goal(goal):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    goal = re.sub(r"[^\w\s]", " ", str(goal).lower())
+    return re.sub(r"\s+", " ", goal).strip()
+
+
+class GoalSkillCache:
+    """SQLite-backed goal -> skills store with exact and semantic lookup"""
+
+    def __init__(self, path, similarity_threshold=0.92, semantic=True, max_entries=DEFAULT_MAX_ENTRIES):
+        self.similarity_threshold = similarity_threshold
+        self.semantic = semantic
+        self.max_entries = max_entries
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0}
+
+        self._lock = threading.Lock()
+        self._matrix = None  # goal embeddings, loaded lazily
+        self._matrix_goals = []
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS goals ("
+            "normalized TEXT PRIMARY KEY, goal TEXT NOT NULL, skills TEXT NOT NULL, "
+            "embedding BLOB, created REAL NOT NULL, last_used REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(goals)")}
+        if "last_used" not in columns:
+            # Caches written before the size bound
+            self._db.execute("ALTER TABLE goals ADD COLUMN last_used REAL")
+            self._db.execute("UPDATE goals SET last_used = created")
+        self._db.execute("CREATE INDEX IF NOT EXISTS goals_last_used ON goals(last_used)")
+        self._db.commit()
+
+    def _embed(self, text):
+        from recommender.embedder import get_embeddings
+        return get_embeddings([text])[0]
+
+    def _touch(self, normalized):
+        """Mark a goal as used (called with the lock held)"""
+        self._db.execute("UPDATE goals SET last_used = ? WHERE normalized = ?", (time.time(), normalized))
+        self._db.commit()
+
+    def _load_matrix(self):
+        import numpy as np
+
+        rows = self._db.execute(
+            "SELECT normalized, embedding FROM goals WHERE embedding IS NOT NULL"
+        ).fetchall()
+        self._matrix_goals = [normalized for normalized, _ in rows]
+        if rows:
+            self._matrix = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows])
+        else:
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def _semantic_lookup(self, normalized):
+        import numpy as np
+
+        with self._lock:
+            if self._matrix is None:
+                self._load_matrix()
+            matrix, goals = self._matrix, list(self._matrix_goals)
+        if not goals:
+            return None
+
+        query = self._embed(normalized)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        scores = matrix @ query / np.maximum(norms, 1e-12)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT skills FROM goals WHERE normalized = ?", (goals[best],)
+            ).fetchone()
+            if row is None:
+                return None  # evicted since the matrix was loaded
+            self._touch(goals[best])
+        return json.loads(row[0])
+
+    def lookup(self, goal):
+        """Return cached skills for the goal (or a near-duplicate of it), else None"""
+        normalized = normalize_goal(goal)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT skills FROM goals WHERE normalized = ?", (normalized,)
+            ).fetchone()
+            if row:
+                self._touch(normalized)
+        if row:
+            self.stats["exact_hits"] += 1
+            return json.loads(row[0])
+
+        if self.semantic:
+            try:
+                skills = self._semantic_lookup(normalized)
+            except Exception as e:
+                print(f"⚠️ Semantic goal lookup unavailable: {e}")
+                skills = None
+            if skills is not None:
+                self.stats["semantic_hits"] += 1
+                return skills
+
+        self.stats["misses"] += 1
+        return None
+
+    def store(self, goal, skills):
+        """Remember the skills extracted for a goal"""
+        normalized = normalize_goal(goal)
+        embedding = None
+        if self.semantic:
+            try:
+                embedding = self._embed(normalized)
+            except Exception as e:
+                print(f"⚠️ Could not embed goal for the skill cache: {e}")
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO goals (normalized, goal, skills, embedding, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalized, goal, json.dumps(skills),
+                 embedding.tobytes() if embedding is not None else None, now, now),
+            )
+            evicted = self._db.execute(
+                "DELETE FROM goals WHERE normalized IN ("
+                "SELECT normalized FROM goals ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self._db.commit()
+            self.stats["evictions"] += max(evicted, 0)
+            # Rebuilt from the store on the next semantic lookup
+            self._matrix = None
@@ -1,20 +1,87 @@
 # utils/skills_extractor.py
 
 import os
-import google.generativeai as genai
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from utils import metrics
+from utils.extraction_scheduler import ExtractionScheduler
+from utils.skill_cache import GoalSkillCache
 
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 print("🔑 GEMINI_API_KEY Loaded:", bool(os.getenv("GEMINI_API_KEY")))
 
-def extract_skills(goal):
-    print("🧠 Using Gemini to extract skills for:", goal)
+# Goal -> skills cache; set SKILL_CACHE_PATH="" to disable
+DEFAULT_SKILL_CACHE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "memory", "skills_cache.db")
+)
+
+FALLBACK_SKILLS = ["Python", "SQL", "Git", "Problem Solving"]
+
+# Concurrent goals are coalesced into batched Gemini prompts; set SKILL_BATCHING=0
+# to send one prompt per goal
+SKILL_BATCHING = os.getenv("SKILL_BATCHING", "1") != "0"
+EXTRACTION_TIMEOUT = float(os.getenv("SKILL_EXTRACTION_TIMEOUT", 20))
+
+_model = None
+_skill_cache = None
+_scheduler = None
+_lock = threading.Lock()
+
+
+def get_gemini_model():
+    """
+    Reuse a single GenerativeModel instead of building one per call.
+    google.generativeai is imported and configured on first use, not at import.
+    """
+    global _model
+    if _model is None:
+        with _lock:
+            if _model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                _model = genai.GenerativeModel("gemini-2.0-flash")  # or "gemini-pro" if that's what you used before
+    return _model
+
+
+def get_skill_cache():
+    """Shared goal -> skills cache, or None when disabled"""
+    global _skill_cache
+    path = os.getenv("SKILL_CACHE_PATH", DEFAULT_SKILL_CACHE_PATH)
+    if not path:
+        return None
+    if _skill_cache is None:
+        with _lock:
+            if _skill_cache is None:
+                _skill_cache = GoalSkillCache(
+                    path,
+                    similarity_threshold=float(os.getenv("SKILL_CACHE_SIMILARITY", 0.92)),
+                    semantic=os.getenv("SKILL_CACHE_SEMANTIC", "1") != "0",
+                    max_entries=int(os.getenv("SKILL_CACHE_MAX_ENTRIES", 10_000)),
+                )
+    return _skill_cache
+
+
+def get_extraction_scheduler():
+    """Shared scheduler that batches concurrent goals into one Gemini prompt"""
+    global _scheduler
+    if _scheduler is None:
+        with _lock:
+            if _scheduler is None:
+                _scheduler = ExtractionScheduler(
+                    get_gemini_model,
+                    window=float(os.getenv("SKILL_BATCH_WINDOW_MS", 25)) / 1000,
+                    max_batch=int(os.getenv("SKILL_BATCH_MAX_GOALS", 16)),
+                    max_concurrent=int(os.getenv("GEMINI_MAX_CONCURRENT", 4)),
+                )
+    return _scheduler
 
-    try:
-        model = genai.GenerativeModel("gemini-2.0-flash")  # or "gemini-pro" if that's what you used before
 
-        prompt = f"""
+def _extract_single(goal):
+    """One Gemini prompt for one goal"""
+    model = get_gemini_model()
+
+    prompt = f"""
 You are an expert career assistant.
 The user says: "{goal}"
 Generate a list of 5 to 7 clean, search-friendly skills or topics they should learn.
@@ -26,13 +93,53 @@ Generate a list of 5 to 7 clean, search-friendly skills or topics they should le
 Return only a **comma-separated list** with no explanation or formatting.
 """
 
+    with metrics.timer("gemini_request_seconds"):
         response = model.generate_content(prompt)
-        raw_output = response.text.strip()
-        print("✅ Gemini Output:", raw_output)
+    raw_output = response.text.strip()
+    print("✅ Gemini Output:", raw_output)
+
+    return [skill.strip().title() for skill in raw_output.split(",") if skill.strip()]
+
 
-        skills = [skill.strip().title() for skill in raw_output.split(",") if skill.strip()]
+@metrics.timed("skill_extraction_seconds")
+def extract_skills(goal):
+    cache = get_skill_cache()
+    if cache is not None:
+        cached = cache.lookup(goal)
+        if cached is not None:
+            print("♻️ Reusing cached skills for:", goal)
+            metrics.incr("skill_extraction_total", source="cache")
+            return cached
+
+    print("🧠 Using Gemini to extract skills for:", goal)
+
+    try:
+        if SKILL_BATCHING:
+            skills = get_extraction_scheduler().extract(goal, timeout=EXTRACTION_TIMEOUT)
+            if skills is None:
+                raise RuntimeError(f"batched extraction failed or exceeded {EXTRACTION_TIMEOUT:.0f}s")
+        else:
+            skills = _extract_single(goal)
+
+        # Only real LLM answers are cached, never the fallback list
+        if cache is not None and skills:
+            cache.store(goal, skills)
+        metrics.incr("skill_extraction_total", source="llm")
         return skills
 
     except Exception as e:
         print("❌ Gemini Error:", e)
-        return ["Python", "SQL", "Git", "Problem Solving"]  # Fallback list
+        metrics.incr("skill_extraction_total", source="fallback")
+        return list(FALLBACK_SKILLS)
+
+
+def extract_skills_many(goals, max_workers=32):
+    """
+    extract_skills for many goals at once. The calls run concurrently, so the
+    cache misses are coalesced into a few batched Gemini prompts.
+    """
+    goals = list(goals)
+    if not goals:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(goals))) as pool:
+        return list(pool.map(extract_skills, goals))